@@ -4,23 +4,41 @@ AI-powered platform for IT content aggregation and SEO optimization
 """
 
 import os
+import re
+import ast
+import json
+import math
+import heapq
 import asyncio
+import time
 import logging
 import hashlib
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import zlib
+import mmap
+import struct
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Callable, Awaitable
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, status
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import httpx
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+from pydantic_core import to_json
 import redis.asyncio as redis
 from cachetools import TTLCache
 import sqlite3
-from pathlib import Path
+import queue
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, deque
+from array import array
+from urllib.parse import urlsplit, parse_qsl, urlencode
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -34,6 +52,8 @@ class SearchRequest(BaseModel):
     date_range: str = Field(default="week")
     popularity_threshold: str = Field(default="medium")
     max_results: int = Field(default=50, ge=1, le=100)
+    sort: str = Field(default="relevance", pattern="^(relevance|date|engagement)$")
+    cursor: Optional[str] = Field(default=None, max_length=2048)
 
 class SearchResult(BaseModel):
     id: str
@@ -47,6 +67,20 @@ class SearchResult(BaseModel):
     category: Optional[str] = None
     tags: List[str] = []
     seo_score: Optional[float] = None
+    duplicates: List[Dict[str, str]] = []
+
+class ResultPage(list):
+    """
+    One page of results plus the token that resumes after it (None on the last page).
+    complete is False when part of the page could not be fetched; fingerprints
+    maps result ids to their SimHash once the page has been loaded by search_source.
+    """
+    
+    def __init__(self, items=(), next_page: Any = None, complete: bool = True, fingerprints: Optional[Dict[str, Optional[int]]] = None):
+        super().__init__(items)
+        self.next_page = next_page
+        self.complete = complete
+        self.fingerprints = fingerprints
 
 class SEOSuggestionRequest(BaseModel):
     content: str = Field(..., min_length=10)
@@ -62,6 +96,25 @@ class SEOSuggestion(BaseModel):
     seo_score: float
     recommendations: List[str]
 
+class ParagraphEdit(BaseModel):
+    index: int = Field(..., ge=0)
+    text: str
+
+class SEODraftRequest(BaseModel):
+    document_id: str = Field(..., min_length=1, max_length=128)
+    paragraph_count: int = Field(..., ge=1, le=10000)
+    paragraphs: List[ParagraphEdit] = Field(default=[])
+    revision: Optional[int] = Field(default=None, ge=0)
+    target_keywords: List[str] = Field(default=[])
+    language: str = Field(default="it")
+    content_type: str = Field(default="article")
+
+class SEODraftSuggestion(SEOSuggestion):
+    document_id: str
+    revision: int
+    paragraphs_analyzed: int
+    paragraphs_reused: int
+
 class TaxonomyItem(BaseModel):
     id: str
     name: str
@@ -94,25 +147,259 @@ class Config:
     
     # Cache settings
     CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 hour
+    CACHE_SOFT_TTL = int(os.getenv("CACHE_SOFT_TTL", "900"))  # served stale and refreshed after 15 minutes
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+    CACHE_L2_ENABLED = os.getenv("CACHE_L2_ENABLED", "true").lower() == "true"
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))  # seconds
+    CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+    
+    # Request coalescing across workers (needs Redis)
+    SINGLEFLIGHT_DISTRIBUTED = os.getenv("SINGLEFLIGHT_DISTRIBUTED", "false").lower() == "true"
+    SINGLEFLIGHT_RESULT_TTL = int(os.getenv("SINGLEFLIGHT_RESULT_TTL", "10"))  # seconds
+    SINGLEFLIGHT_POLL_INTERVAL = float(os.getenv("SINGLEFLIGHT_POLL_INTERVAL", "0.05"))  # seconds
+    
+    # Search fan-out timeouts (seconds)
+    SEARCH_DEADLINE = float(os.getenv("SEARCH_DEADLINE", "8"))
+    SOURCE_TIMEOUT = float(os.getenv("SOURCE_TIMEOUT", "6"))
+    
+    # Relevance ranking
+    RANK_WEIGHT_MATCH = float(os.getenv("RANK_WEIGHT_MATCH", "0.5"))
+    RANK_WEIGHT_RECENCY = float(os.getenv("RANK_WEIGHT_RECENCY", "0.3"))
+    RANK_WEIGHT_ENGAGEMENT = float(os.getenv("RANK_WEIGHT_ENGAGEMENT", "0.2"))
+    RANK_RECENCY_HALF_LIFE_HOURS = float(os.getenv("RANK_RECENCY_HALF_LIFE_HOURS", "48"))
+    
+    # Duplicate collapsing
+    DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))  # SimHash bits, at most 3
+    DEDUP_MIN_WORDS = int(os.getenv("DEDUP_MIN_WORDS", "8"))
+    
+    # Reddit multi-subreddit search: "parallel" or "combined"
+    REDDIT_SEARCH_MODE = os.getenv("REDDIT_SEARCH_MODE", "parallel")
+    REDDIT_MAX_CONCURRENCY = int(os.getenv("REDDIT_MAX_CONCURRENCY", "5"))
+    REDDIT_TOKEN_REFRESH_MARGIN = float(os.getenv("REDDIT_TOKEN_REFRESH_MARGIN", "60"))  # seconds
     
     # Rate limiting
     RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
     
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./zerocrash.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+    DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+    DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "20000"))
+    DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_MAINTENANCE_INTERVAL = float(os.getenv("DB_MAINTENANCE_INTERVAL", "300"))  # seconds
+    
+    # Write-behind queue for search results
+    WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "500"))
+    WRITE_FLUSH_INTERVAL = float(os.getenv("WRITE_FLUSH_INTERVAL", "1.0"))  # seconds
+    WRITE_QUEUE_MAX = int(os.getenv("WRITE_QUEUE_MAX", "10000"))
+    
+    # Corpus term index (TF-IDF statistics of stored results), next to the database file by default
+    CORPUS_INDEX_PATH = os.getenv("CORPUS_INDEX_PATH", "")
+    CORPUS_INDEX_INTERVAL = float(os.getenv("CORPUS_INDEX_INTERVAL", "600"))  # seconds
+    CORPUS_INDEX_BATCH_SIZE = int(os.getenv("CORPUS_INDEX_BATCH_SIZE", "5000"))
+    
+    # Outbound HTTP connection pool
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+    HTTP_MAX_KEEPALIVE_PER_HOST = int(os.getenv("HTTP_MAX_KEEPALIVE_PER_HOST", "10"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+    HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
 
 config = Config()
 
 # Initialize cache
 memory_cache = TTLCache(maxsize=1000, ttl=config.CACHE_TTL)
 
+# Search results travel as models until the response is written: cached values and
+# responses are serialized by pydantic-core in one pass, without a dict copy per model.
+search_results_adapter = TypeAdapter(List[SearchResult])
+
+def encode_cache_value(value: Any) -> bytes:
+    """Serialize a cache value as compact JSON, zlib-compressed when large"""
+    payload = to_json(value)
+    if len(payload) > config.CACHE_COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(payload)
+    return b"j" + payload
+
+def decode_cache_value(raw: bytes) -> Any:
+    """Inverse of encode_cache_value"""
+    payload = zlib.decompress(raw[1:]) if raw[:1] == b"z" else raw[1:]
+    return json.loads(payload)
+
+class RedisCache:
+    """Shared L2 cache; skipped for a back-off period whenever Redis is unreachable"""
+    
+    # Only delete the lock if we still own it
+    RELEASE_LOCK_SCRIPT = """
+        if redis.call("get", KEYS[1]) == ARGV[1] then
+            return redis.call("del", KEYS[1])
+        end
+        return 0
+    """
+    
+    def __init__(self, url: str, retry_after: float = 30.0):
+        self.url = url
+        self.retry_after = retry_after
+        self._client: Optional[redis.Redis] = None
+        self._down_until = 0.0
+        # Clients dropped after a failure, still closing their connection pools
+        self._closing: set = set()
+    
+    @property
+    def available(self) -> bool:
+        return config.CACHE_L2_ENABLED and time.monotonic() >= self._down_until
+    
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.from_url(
+                self.url,
+                socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=config.REDIS_SOCKET_TIMEOUT
+            )
+        return self._client
+    
+    async def get(self, key: str) -> Optional[Any]:
+        if not self.available:
+            return None
+        try:
+            raw = await self.client.get(key)
+        except Exception as e:
+            self._mark_down(e)
+            return None
+        return decode_cache_value(raw) if raw is not None else None
+    
+    async def set(self, key: str, value: Any, ttl: int):
+        if not self.available:
+            return
+        try:
+            await self.client.set(key, encode_cache_value(value), ex=ttl)
+        except Exception as e:
+            self._mark_down(e)
+    
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> Optional[bool]:
+        """Try to take a cross-worker lock; None when Redis is unavailable"""
+        if not self.available:
+            return None
+        try:
+            return bool(await self.client.set(key, token, nx=True, px=int(ttl * 1000)))
+        except Exception as e:
+            self._mark_down(e)
+            return None
+    
+    async def release_lock(self, key: str, token: str):
+        if not self.available:
+            return
+        try:
+            await self.client.eval(self.RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            self._mark_down(e)
+    
+    async def exists(self, key: str) -> bool:
+        if not self.available:
+            return False
+        try:
+            return bool(await self.client.exists(key))
+        except Exception as e:
+            self._mark_down(e)
+            return False
+    
+    async def ping(self) -> bool:
+        if not self.available:
+            return False
+        try:
+            return await self.client.ping()
+        except Exception as e:
+            self._mark_down(e)
+            return False
+    
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(task for task in self._closing if task.get_loop() is loop), return_exceptions=True)
+    
+    def _mark_down(self, error: Exception):
+        logger.warning(f"Redis cache unavailable, using in-memory cache only for {self.retry_after}s: {error}")
+        self._down_until = time.monotonic() + self.retry_after
+        # Drop the client so the next attempt reconnects from scratch, closing its pool
+        client, self._client = self._client, None
+        if client is not None:
+            closing = asyncio.create_task(self._close_client(client))
+            self._closing.add(closing)
+            closing.add_done_callback(self._closing.discard)
+    
+    @staticmethod
+    async def _close_client(client: redis.Redis):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing dropped Redis client: {e}")
+
+redis_cache = RedisCache(config.REDIS_URL)
+
+class SingleFlight:
+    """Deduplicates concurrent calls for the same key so they share one execution"""
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]):
+        """Run fn, or join the in-flight call for key. Returns the value and whether it was shared."""
+        call = self._calls.get(key)
+        if call is not None and not call.done() and call.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(call), True
+        
+        call = asyncio.create_task(fn())
+        self._calls[key] = call
+        call.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so that a cancelled caller does not cancel the call for everyone else
+        return await asyncio.shield(call), False
+    
+    def _forget(self, key: str, call: asyncio.Task):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+cache_flight = SingleFlight()
+search_flight = SingleFlight()
+
 # Database setup
-def init_db():
-    """Initialize SQLite database"""
-    db_path = Path("zerocrash.db")
-    conn = sqlite3.connect(str(db_path))
+def database_path(url: str) -> str:
+    """SQLite path (or URI) for a sqlite:/// DATABASE_URL"""
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else url
+    if path == ":memory:":
+        # Shared-cache URI so every pooled connection sees the same in-memory database
+        return "file:zerocrash?mode=memory&cache=shared"
+    return path
+
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+def connect_db() -> sqlite3.Connection:
+    """Open a connection to the application database with the tuned connection profile"""
+    path = database_path(config.DATABASE_URL)
+    conn = sqlite3.connect(
+        path,
+        uri=path.startswith("file:"),
+        check_same_thread=False,
+        timeout=config.DB_BUSY_TIMEOUT_MS / 1000
+    )
+    
+    synchronous = config.DB_SYNCHRONOUS.upper()
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid DB_SYNCHRONOUS: {config.DB_SYNCHRONOUS}")
     
+    # WAL lets readers proceed while a writer is active
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size={-int(config.DB_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+def create_schema(conn: sqlite3.Connection):
+    """Create tables and default IT taxonomy if missing"""
     # Create tables
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS search_results (
@@ -151,9 +438,14 @@ def init_db():
         
         CREATE INDEX IF NOT EXISTS idx_search_query ON search_results(query);
         CREATE INDEX IF NOT EXISTS idx_search_source ON search_results(source);
+        CREATE INDEX IF NOT EXISTS idx_search_published ON search_results(published_at);
         CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories(parent_id);
     """)
     
+    create_search_index(conn)
+    create_category_counts(conn)
+    create_json_columns(conn)
+    
     # Insert default IT taxonomy
     categories = [
         ("ai-ml", "AI & Machine Learning", None, "Intelligenza artificiale e machine learning", "AI,machine learning,deep learning,neural networks"),
@@ -174,16 +466,386 @@ def init_db():
         )
     
     conn.commit()
-    conn.close()
+
+def create_search_index(conn: sqlite3.Connection):
+    """Create the FTS5 index over search_results, kept in sync by triggers"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_results_fts'"
+    ).fetchone()
+    
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_results_fts USING fts5(
+                title, description, author, tags,
+                content='search_results', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            
+            CREATE TRIGGER IF NOT EXISTS search_results_fts_insert AFTER INSERT ON search_results BEGIN
+                INSERT INTO search_results_fts(rowid, title, description, author, tags)
+                VALUES (new.rowid, new.title, new.description, new.author, new.tags);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS search_results_fts_delete AFTER DELETE ON search_results BEGIN
+                INSERT INTO search_results_fts(search_results_fts, rowid, title, description, author, tags)
+                VALUES ('delete', old.rowid, old.title, old.description, old.author, old.tags);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS search_results_fts_update AFTER UPDATE ON search_results BEGIN
+                INSERT INTO search_results_fts(search_results_fts, rowid, title, description, author, tags)
+                VALUES ('delete', old.rowid, old.title, old.description, old.author, old.tags);
+                INSERT INTO search_results_fts(rowid, title, description, author, tags)
+                VALUES (new.rowid, new.title, new.description, new.author, new.tags);
+            END;
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Full-text search index unavailable, local search disabled: {e}")
+        return
+    
+    if not exists:
+        # Index rows stored before the index existed
+        conn.execute("INSERT INTO search_results_fts(search_results_fts) VALUES ('rebuild')")
+
+# Indexed columns generated from the JSON payloads, so SQL can sort and filter on hot fields
+JSON_GENERATED_COLUMNS = [
+    ("search_results", "engagement_views", "INTEGER", "engagement_data", "$.views"),
+    ("search_results", "engagement_score", "INTEGER", "engagement_data", "$.score"),
+    ("search_results", "engagement_comments", "INTEGER", "engagement_data", "$.comments"),
+    ("seo_suggestions", "suggestion_seo_score", "REAL", "suggestions_data", "$.seo_score"),
+]
+
+def _convert_legacy_payloads(conn: sqlite3.Connection, table: str, column: str):
+    """Rewrite payloads stored as Python reprs (before JSON storage) as JSON"""
+    rows = conn.execute(
+        f"SELECT rowid, {column} FROM {table} WHERE {column} IS NOT NULL AND NOT json_valid({column})"
+    ).fetchall()
+    
+    converted = []
+    for rowid, payload in rows:
+        try:
+            converted.append((json.dumps(ast.literal_eval(payload), separators=(",", ":"), default=str), rowid))
+        except (ValueError, SyntaxError):
+            converted.append((None, rowid))
+    conn.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", converted)
+
+def create_json_columns(conn: sqlite3.Connection):
+    """Add generated columns (and their indexes) over the JSON payload columns"""
+    migrated = set()
+    for table, name, column_type, source, path in JSON_GENERATED_COLUMNS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+        if name not in columns:
+            if (table, source) not in migrated:
+                _convert_legacy_payloads(conn, table, source)
+                migrated.add((table, source))
+            conn.execute(f"""
+                ALTER TABLE {table} ADD COLUMN {name} {column_type}
+                GENERATED ALWAYS AS (CASE WHEN json_valid({source}) THEN json_extract({source}, '{path}') END) VIRTUAL
+            """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{name} ON {table}({name})")
+    conn.commit()
+
+# Categories a stored result belongs to: same rule the taxonomy counts have always used
+RESULT_CATEGORY_MATCH = "c.name = :category OR :tags LIKE '%' || c.name || '%'"
+
+def create_category_counts(conn: sqlite3.Connection):
+    """Create the result-to-category join table and the per-category counters it maintains"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'result_categories'"
+    ).fetchone()
+    
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS result_categories (
+            result_id TEXT NOT NULL,
+            category_id TEXT NOT NULL,
+            PRIMARY KEY (result_id, category_id)
+        ) WITHOUT ROWID;
+        
+        CREATE TABLE IF NOT EXISTS category_counts (
+            category_id TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        );
+        
+        CREATE INDEX IF NOT EXISTS idx_result_categories_category ON result_categories(category_id);
+        
+        CREATE TRIGGER IF NOT EXISTS result_categories_count_insert AFTER INSERT ON result_categories BEGIN
+            INSERT INTO category_counts(category_id, count) VALUES (new.category_id, 1)
+            ON CONFLICT(category_id) DO UPDATE SET count = count + 1;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS result_categories_count_delete AFTER DELETE ON result_categories BEGIN
+            UPDATE category_counts SET count = count - 1 WHERE category_id = old.category_id;
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS search_results_categories_delete AFTER DELETE ON search_results BEGIN
+            DELETE FROM result_categories WHERE result_id = old.id;
+        END;
+    """)
+    
+    if not exists:
+        # One-off backfill for results stored before the counters existed
+        conn.execute("""
+            INSERT OR IGNORE INTO result_categories (result_id, category_id)
+            SELECT r.id, c.id
+            FROM search_results r
+            JOIN categories c ON c.name = r.category OR r.tags LIKE '%' || c.name || '%'
+        """)
+    conn.commit()
+
+def update_result_categories(conn: sqlite3.Connection, rows: List[tuple]):
+    """Re-link stored results to their categories; counters follow through triggers"""
+    params = [{"id": row[0], "category": row[9], "tags": row[10]} for row in rows]
+    conn.executemany(f"""
+        DELETE FROM result_categories
+        WHERE result_id = :id
+          AND category_id NOT IN (SELECT c.id FROM categories c WHERE {RESULT_CATEGORY_MATCH})
+    """, params)
+    conn.executemany(f"""
+        INSERT OR IGNORE INTO result_categories (result_id, category_id)
+        SELECT :id, c.id FROM categories c WHERE {RESULT_CATEGORY_MATCH}
+    """, params)
+
+class Database:
+    """
+    Async access to SQLite: work runs on a dedicated thread pool, reusing a pool
+    of connections, so disk I/O never blocks the event loop.
+    """
+    
+    def __init__(self, pool_size: int = 4):
+        self.pool_size = pool_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._idle: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # One connection per worker thread at most
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="zerocrash-db")
+            return self._executor
+    
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(conn, *args) on a pooled connection off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self._run_sync, fn, *args))
+    
+    async def fetchall(self, sql: str, params: tuple = ()) -> List[tuple]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+    
+    async def execute(self, sql: str, params: tuple = ()):
+        def execute_and_commit(conn: sqlite3.Connection):
+            conn.execute(sql, params)
+            conn.commit()
+        
+        await self.run(execute_and_commit)
+    
+    async def maintain(self):
+        """Checkpoint the WAL and let SQLite refresh its query planner statistics"""
+        def checkpoint_and_optimize(conn: sqlite3.Connection):
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA optimize")
+        
+        await self.run(checkpoint_and_optimize)
+    
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._idle = queue.SimpleQueue()
+            self._schema_ready = False
+    
+    def _run_sync(self, fn: Callable[..., Any], *args) -> Any:
+        conn = self._acquire()
+        try:
+            return fn(conn, *args)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+    
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        conn = connect_db()
+        with self._lock:
+            self._connections.append(conn)
+            if not self._schema_ready:
+                create_schema(conn)
+                self._schema_ready = True
+        return conn
+
+db = Database(pool_size=config.DB_POOL_SIZE)
+
+async def run_db_maintenance(interval: float):
+    """Periodically checkpoint and optimize the database"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await db.maintain()
+        except Exception as e:
+            logger.error(f"Database maintenance error: {e}")
+
+def insert_search_result_rows(conn: sqlite3.Connection, rows: List[tuple]):
+    """Insert search result rows in a single transaction"""
+    with conn:
+        # Upsert rather than REPLACE: REPLACE deletes without firing the full-text index triggers
+        conn.executemany("""
+            INSERT INTO search_results 
+            (id, query, title, description, url, source, author, published_at, engagement_data, category, tags, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                query = excluded.query,
+                title = excluded.title,
+                description = excluded.description,
+                url = excluded.url,
+                source = excluded.source,
+                author = excluded.author,
+                published_at = excluded.published_at,
+                engagement_data = excluded.engagement_data,
+                category = excluded.category,
+                tags = excluded.tags,
+                created_at = excluded.created_at
+        """, rows)
+        update_result_categories(conn, rows)
+
+class SearchResultWriter:
+    """
+    Write-behind queue for search results. Rows from many requests are
+    accumulated and flushed together once WRITE_BATCH_SIZE rows are pending or
+    WRITE_FLUSH_INTERVAL has passed. Producers wait when the queue is full.
+    """
+    
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def running(self) -> bool:
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is asyncio.get_running_loop()
+        )
+    
+    def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+    
+    async def put(self, rows: List[tuple]):
+        for row in rows:
+            await self._queue.put(row)
+    
+    async def stop(self):
+        """Flush everything still queued, then stop the writer"""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            deadline = loop.time() + self.flush_interval
+            batch = []
+            while True:
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    row = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        row = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+            
+            if batch:
+                await self._flush(batch)
+    
+    async def _flush(self, batch: List[tuple]):
+        try:
+            await db.run(insert_search_result_rows, batch)
+        except Exception as e:
+            logger.error(f"Error saving {len(batch)} search results: {e}")
+
+search_writer = SearchResultWriter(
+    batch_size=config.WRITE_BATCH_SIZE,
+    flush_interval=config.WRITE_FLUSH_INTERVAL,
+    max_pending=config.WRITE_QUEUE_MAX
+)
+
+# Shared HTTP client pool
+PROVIDER_HOSTS = ["gnews.io", "www.googleapis.com", "www.reddit.com", "oauth.reddit.com"]
+
+http_client: Optional[httpx.AsyncClient] = None
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client shared by all provider clients"""
+    http2 = config.HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP2_ENABLED is set but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+    
+    limits = httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_PER_HOST,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+    )
+    
+    # One transport per provider host so every host gets its own connection limits
+    mounts = {
+        f"https://{host}": httpx.AsyncHTTPTransport(limits=limits, http2=http2)
+        for host in PROVIDER_HOSTS
+    }
+    
+    return httpx.AsyncClient(limits=limits, http2=http2, mounts=mounts)
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it lazily when running outside the app lifespan"""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = create_http_client()
+    return http_client
 
 # API Clients
 class GoogleNewsClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
         self.base_url = "https://gnews.io/api/v4"
+        self.http_client = http_client
     
-    async def search(self, query: str, category: str = None, days: int = 7) -> List[Dict]:
-        """Search Google News via GNews.io API"""
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.http_client or get_http_client()
+    
+    async def search(self, query: str, category: str = None, days: int = 7, page: int = 1) -> List[Dict]:
+        """Search Google News via GNews.io API; the result carries the next page number"""
         if config.MOCK_MODE:
             return self._get_mock_news_data(query)
         
@@ -199,16 +861,18 @@ class GoogleNewsClient:
         
         if category:
             params["category"] = category
+        if page > 1:
+            params["page"] = page
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=10.0)
-                response.raise_for_status()
-                data = response.json()
-                return data.get("articles", [])
+            response = await self.client.get(url, params=params, timeout=10.0)
+            response.raise_for_status()
+            data = response.json()
+            articles = data.get("articles", [])
+            return ResultPage(articles, next_page=page + 1 if len(articles) >= params["max"] else None)
         except Exception as e:
             logger.error(f"Google News API error: {e}")
-            return []
+            raise
     
     def _get_mock_news_data(self, query: str) -> List[Dict]:
         """Mock Google News data for testing"""
@@ -240,12 +904,17 @@ class GoogleNewsClient:
         ]
 
 class YouTubeClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
         self.base_url = "https://www.googleapis.com/youtube/v3"
+        self.http_client = http_client
     
-    async def search(self, query: str, max_results: int = 20) -> List[Dict]:
-        """Search YouTube via YouTube Data API v3"""
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.http_client or get_http_client()
+    
+    async def search(self, query: str, max_results: int = 20, page_token: Optional[str] = None) -> List[Dict]:
+        """Search YouTube via YouTube Data API v3; the result carries the next page token"""
         if config.MOCK_MODE:
             return self._get_mock_youtube_data(query)
         
@@ -260,26 +929,27 @@ class YouTubeClient:
             "publishedAfter": (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%SZ"),
             "order": "relevance"
         }
+        if page_token:
+            params["pageToken"] = page_token
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=10.0)
-                response.raise_for_status()
-                data = response.json()
-                
-                # Get additional video statistics
-                video_ids = [item["id"]["videoId"] for item in data.get("items", [])]
-                stats = await self._get_video_statistics(video_ids)
-                
-                # Merge data
-                for item in data.get("items", []):
-                    video_id = item["id"]["videoId"]
-                    item["statistics"] = stats.get(video_id, {})
-                
-                return data.get("items", [])
+            response = await self.client.get(url, params=params, timeout=10.0)
+            response.raise_for_status()
+            data = response.json()
+            
+            # Get additional video statistics
+            video_ids = [item["id"]["videoId"] for item in data.get("items", [])]
+            stats = await self._get_video_statistics(video_ids)
+            
+            # Merge data
+            for item in data.get("items", []):
+                video_id = item["id"]["videoId"]
+                item["statistics"] = stats.get(video_id, {})
+            
+            return ResultPage(data.get("items", []), next_page=data.get("nextPageToken"))
         except Exception as e:
             logger.error(f"YouTube API error: {e}")
-            return []
+            raise
     
     async def _get_video_statistics(self, video_ids: List[str]) -> Dict:
         """Get video statistics for given video IDs"""
@@ -294,16 +964,15 @@ class YouTubeClient:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=10.0)
-                response.raise_for_status()
-                data = response.json()
-                
-                stats = {}
-                for item in data.get("items", []):
-                    stats[item["id"]] = item.get("statistics", {})
-                
-                return stats
+            response = await self.client.get(url, params=params, timeout=10.0)
+            response.raise_for_status()
+            data = response.json()
+            
+            stats = {}
+            for item in data.get("items", []):
+                stats[item["id"]] = item.get("statistics", {})
+            
+            return stats
         except Exception as e:
             logger.error(f"YouTube statistics API error: {e}")
             return {}
@@ -347,33 +1016,150 @@ class YouTubeClient:
             }
         ]
 
+class RedditTokenManager:
+    """Caches the Reddit OAuth token and refreshes it before it expires"""
+    
+    def __init__(self, fetch_token: Callable[[], Awaitable[Dict]], refresh_margin: float = 60.0):
+        self._fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self.access_token: Optional[str] = None
+        self.expires_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    async def get_token(self) -> str:
+        """Return a valid token, refreshing in the background when it is close to expiry"""
+        now = time.monotonic()
+        if self.access_token and now < self.expires_at:
+            if now >= self.expires_at - self.refresh_margin:
+                self._start_refresh()
+            return self.access_token
+        
+        return await self.refresh()
+    
+    async def refresh(self) -> str:
+        """Fetch a new token; concurrent callers share a single request"""
+        return await asyncio.shield(self._start_refresh())
+    
+    def invalidate(self, token: str):
+        """Drop a token rejected by the API, unless it was already replaced"""
+        if token == self.access_token:
+            self.access_token = None
+            self.expires_at = 0.0
+    
+    def _start_refresh(self) -> asyncio.Task:
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._refresh())
+            task.add_done_callback(self._log_refresh_failure)
+            self._refresh_task = task
+        return task
+    
+    async def _refresh(self) -> str:
+        token_data = await self._fetch_token()
+        self.access_token = token_data["access_token"]
+        self.expires_at = time.monotonic() + float(token_data.get("expires_in", 3600))
+        return self.access_token
+    
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Reddit authentication error: {task.exception()}")
+
 class RedditClient:
-    def __init__(self, client_id: str, client_secret: str):
+    DEFAULT_SUBREDDITS = ["programming", "MachineLearning", "cybersecurity", "webdev", "datascience"]
+    
+    def __init__(self, client_id: str, client_secret: str, http_client: Optional[httpx.AsyncClient] = None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.base_url = "https://oauth.reddit.com"
-        self.access_token = None
+        self.http_client = http_client
+        self.token_manager = RedditTokenManager(self._request_token, refresh_margin=config.REDDIT_TOKEN_REFRESH_MARGIN)
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self.http_client or get_http_client()
     
-    async def search(self, query: str, subreddits: List[str] = None) -> List[Dict]:
-        """Search Reddit posts"""
+    async def search(self, query: str, subreddits: List[str] = None, limit: int = 20, mode: str = None, after: Any = None) -> List[Dict]:
+        """
+        Search Reddit posts.
+        mode "parallel" queries each subreddit concurrently, "combined" issues a
+        single r/a+b+c request; defaults to REDDIT_SEARCH_MODE.
+        after resumes from the next_page of a previous result: the listing's
+        "after" in combined mode, a {subreddit: after} map in parallel mode.
+        """
         if config.MOCK_MODE:
             return self._get_mock_reddit_data(query)
         
-        if not self.access_token:
-            await self._authenticate()
+        # Authenticate once up front so parallel subreddit searches share the token
+        await self.token_manager.get_token()
         
         if not subreddits:
-            subreddits = ["programming", "MachineLearning", "cybersecurity", "webdev", "datascience"]
+            subreddits = self.DEFAULT_SUBREDDITS
         
+        mode = mode or config.REDDIT_SEARCH_MODE
+        if mode == "combined":
+            posts = await self._search_subreddit(query, "+".join(subreddits), limit=min(limit, 100), after=after)
+            return ResultPage(posts[:limit], next_page=getattr(posts, "next_page", None))
+        if mode == "parallel":
+            if isinstance(after, dict):
+                subreddits = list(after)
+            return await self._search_subreddits_parallel(query, subreddits, limit, after)
+        
+        raise ValueError(f"Unsupported Reddit search mode: {mode}")
+    
+    async def _search_subreddits_parallel(self, query: str, subreddits: List[str], limit: int, after: Optional[Dict] = None) -> List[Dict]:
+        """Search subreddits with bounded concurrency, stopping once enough posts are collected"""
+        semaphore = asyncio.Semaphore(config.REDDIT_MAX_CONCURRENCY)
+        after = after if isinstance(after, dict) else {}
+        
+        async def search_one(subreddit: str):
+            async with semaphore:
+                try:
+                    return subreddit, await self._search_subreddit(query, subreddit, after=after.get(subreddit)), None
+                except Exception as e:
+                    return subreddit, None, e
+        
+        tasks = [asyncio.create_task(search_one(subreddit)) for subreddit in subreddits]
+        completed = []
+        errors = []
+        collected = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                subreddit, posts, error = await next_done
+                if error is not None:
+                    # A failing subreddit keeps its token and is retried on the next page
+                    errors.append(error)
+                    continue
+                completed.append((subreddit, posts))
+                collected += len(posts)
+                if collected >= limit:
+                    break
+        finally:
+            # Early termination: drop the subreddits that are still pending
+            for task in tasks:
+                task.cancel()
+        
+        if subreddits and len(errors) == len(subreddits):
+            raise errors[0]
+        
+        # Subreddits resume where they were unless every post of theirs made it into this page;
+        # a partly served listing is fetched again and its served posts dropped as duplicates
+        next_after = {subreddit: after.get(subreddit) for subreddit in subreddits}
         all_posts = []
-        for subreddit in subreddits:
-            posts = await self._search_subreddit(query, subreddit)
-            all_posts.extend(posts)
+        for subreddit, posts in completed:
+            served = posts[:limit - len(all_posts)]
+            all_posts.extend(served)
+            if len(served) == len(posts):
+                next_page = getattr(posts, "next_page", None)
+                if next_page:
+                    next_after[subreddit] = next_page
+                else:
+                    del next_after[subreddit]
         
-        return all_posts[:20]  # Limit results
+        return ResultPage(all_posts, next_page=next_after or None, complete=not errors)
     
-    async def _authenticate(self):
-        """Authenticate with Reddit API"""
+    async def _request_token(self) -> Dict:
+        """Request an application-only OAuth token from Reddit"""
         url = "https://www.reddit.com/api/v1/access_token"
         auth = httpx.BasicAuth(self.client_id, self.client_secret)
         data = {
@@ -383,39 +1169,46 @@ class RedditClient:
             "User-Agent": "ZeroCrash/1.0"
         }
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, data=data, auth=auth, headers=headers, timeout=10.0)
-                response.raise_for_status()
-                token_data = response.json()
-                self.access_token = token_data["access_token"]
-        except Exception as e:
-            logger.error(f"Reddit authentication error: {e}")
+        response = await self.client.post(url, data=data, auth=auth, headers=headers, timeout=10.0)
+        response.raise_for_status()
+        return response.json()
     
-    async def _search_subreddit(self, query: str, subreddit: str) -> List[Dict]:
-        """Search specific subreddit"""
+    async def _search_subreddit(self, query: str, subreddit: str, limit: int = 10, after: Optional[str] = None) -> List[Dict]:
+        """Search specific subreddit (or a combined "a+b+c" multireddit); the result carries the listing's next "after" token"""
         url = f"{self.base_url}/r/{subreddit}/search"
-        headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "User-Agent": "ZeroCrash/1.0"
-        }
         params = {
             "q": query,
             "sort": "relevance",
             "restrict_sr": "true",
-            "limit": 10,
+            "limit": limit,
             "t": "week"
         }
+        if after:
+            params["after"] = after
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, headers=headers, timeout=10.0)
-                response.raise_for_status()
-                data = response.json()
-                return data.get("data", {}).get("children", [])
+            token = await self.token_manager.get_token()
+            response = await self._get_with_token(url, params, token)
+            
+            # Token revoked or expired early: refresh once and retry
+            if response.status_code == 401:
+                self.token_manager.invalidate(token)
+                token = await self.token_manager.refresh()
+                response = await self._get_with_token(url, params, token)
+            
+            response.raise_for_status()
+            listing = response.json().get("data", {})
+            return ResultPage(listing.get("children", []), next_page=listing.get("after"))
         except Exception as e:
             logger.error(f"Reddit search error: {e}")
-            return []
+            raise
+    
+    async def _get_with_token(self, url: str, params: Dict, token: str) -> httpx.Response:
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "User-Agent": "ZeroCrash/1.0"
+        }
+        return await self.client.get(url, params=params, headers=headers, timeout=10.0)
     
     def _get_mock_reddit_data(self, query: str) -> List[Dict]:
         """Mock Reddit data for testing"""
@@ -425,6 +1218,7 @@ class RedditClient:
                     "title": f"[D] Quali sono le migliori librerie per {query}?",
                     "selftext": "Sto iniziando il mio percorso nel ML e vorrei sapere quali librerie Python consigliate...",
                     "url": "https://reddit.com/r/MachineLearning/mock-post-1",
+                    "permalink": "/r/MachineLearning/comments/mock1/quali_sono_le_migliori_librerie/",
                     "author": "AIResearcher_IT",
                     "subreddit": "MachineLearning",
                     "created_utc": 1705564800,
@@ -438,6 +1232,7 @@ class RedditClient:
                     "title": f"Best practices per {query} in Python",
                     "selftext": "Condivido alcuni tips utili per ottimizzare le performance...",
                     "url": "https://reddit.com/r/programming/mock-post-2",
+                    "permalink": "/r/programming/comments/mock2/best_practices_in_python/",
                     "author": "DevExpert_IT",
                     "subreddit": "programming",
                     "created_utc": 1705478400,
@@ -448,8 +1243,415 @@ class RedditClient:
             }
         ]
 
+# Keyword matching
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed keyword set. Finds every case-insensitive,
+    whole-word occurrence of every keyword in a single pass over the text.
+    """
+    
+    def __init__(self, keywords: Dict[str, List[str]]):
+        # keywords maps a label (category) to its keywords
+        self.labels: Dict[str, List[str]] = {}
+        self.display: Dict[str, str] = {}
+        for label, words in keywords.items():
+            for word in words:
+                key = word.strip().lower()
+                if not key:
+                    continue
+                self.display.setdefault(key, word.strip())
+                if label not in self.labels.setdefault(key, []):
+                    self.labels[key].append(label)
+        
+        # Trie
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[str]] = [[]]
+        for key in self.labels:
+            node = 0
+            for char in key:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._output.append([])
+                    self._goto[node][char] = child
+                node = child
+            self._output[node].append(key)
+        
+        # Failure links, breadth first; each node also reports the keywords of its suffixes
+        self._fail = [0] * len(self._goto)
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                pending.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+    
+    def find(self, text: str):
+        """Yield (start, keyword) for every whole-word keyword occurrence in text"""
+        lowered = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        
+        for end, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            
+            for key in output[node]:
+                start = end - len(key) + 1
+                if _is_word_char(key[0]) and start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if _is_word_char(key[-1]) and end + 1 < len(lowered) and _is_word_char(lowered[end + 1]):
+                    continue
+                yield start, key
+    
+    def scan(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """Occurrence count and start offsets of every keyword found in text"""
+        hits: Dict[str, Dict[str, Any]] = {}
+        for start, key in self.find(text):
+            hit = hits.setdefault(key, {"keyword": self.display[key], "count": 0, "positions": []})
+            hit["count"] += 1
+            hit["positions"].append(start)
+        return hits
+    
+    def label_counts(self, hits: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """Total keyword occurrences per label for the result of scan()"""
+        counts: Dict[str, int] = {}
+        for key, hit in hits.items():
+            for label in self.labels.get(key, ()):
+                counts[label] = counts.get(label, 0) + hit["count"]
+        return counts
+
+# Term statistics
+TERM_PATTERN = re.compile(r"\w+")
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+PARAGRAPH_SEPARATOR = "\n\n"
+MAX_NGRAM = 3
+
+STOPWORDS = frozenset("""
+    l d c all dall dell nell sull un
+    a ad al alla alle allo agli ai anche che chi ci come con da dal dalla dalle dai degli dei del della delle dello di
+    e ed è gli ha hanno i il in io la le lo loro ma mi ne nel nella nelle nei non o per più può se si sia sono su sua
+    sue suo sul sulla tra un una uno questo questa questi queste quello quella anche molto tutto tutti essere
+    the of and to in is are for on with as by an be this that it or from at
+""".split())
+
+class TermStats:
+    """
+    Term frequencies, n-gram (up to MAX_NGRAM words) frequencies and first
+    positions of a text, computed in one pass over its tokens. Stats of
+    consecutive paragraphs merge into the stats of the whole document; n-grams
+    never span a paragraph break, so merged and whole-text stats are identical.
+    """
+    
+    __slots__ = ("token_count", "ngrams", "first_positions")
+    
+    def __init__(self, token_count: int = 0, ngrams: Optional[List[Dict[str, int]]] = None, first_positions: Optional[Dict[str, int]] = None):
+        self.token_count = token_count
+        self.ngrams = [Counter(counts) for counts in ngrams] if ngrams else [Counter() for _ in range(MAX_NGRAM)]
+        # Token index of the first occurrence of each term or phrase
+        self.first_positions = first_positions or {}
+    
+    @classmethod
+    def from_text(cls, text: str) -> "TermStats":
+        """Stats of a text, treating blank lines as paragraph breaks"""
+        stats = cls()
+        for paragraph in PARAGRAPH_BREAK.split(text):
+            stats.merge(cls.from_paragraph(paragraph))
+        return stats
+    
+    @classmethod
+    def from_paragraph(cls, text: str) -> "TermStats":
+        """Stats of a single paragraph"""
+        tokens = TERM_PATTERN.findall(text.lower())
+        stats = cls(token_count=len(tokens))
+        
+        for n in range(1, MAX_NGRAM + 1):
+            grams = tokens if n == 1 else [" ".join(gram) for gram in zip(*(tokens[i:] for i in range(n)))]
+            stats.ngrams[n - 1].update(grams)
+            # Reverse order so the earliest occurrence is the one that sticks
+            stats.first_positions.update(zip(reversed(grams), range(len(grams) - 1, -1, -1)))
+        
+        return stats
+    
+    def merge(self, other: "TermStats") -> "TermStats":
+        """Append the stats of the text that follows this one, in place"""
+        for counts, other_counts in zip(self.ngrams, other.ngrams):
+            counts.update(other_counts)
+        for term, position in other.first_positions.items():
+            self.first_positions.setdefault(term, self.token_count + position)
+        self.token_count += other.token_count
+        return self
+    
+    def count(self, phrase: str) -> Optional[int]:
+        """Occurrences of a term or phrase; None for phrases longer than MAX_NGRAM words"""
+        terms = TERM_PATTERN.findall(phrase.lower())
+        if not terms or len(terms) > MAX_NGRAM:
+            return None
+        return self.ngrams[len(terms) - 1][" ".join(terms)]
+    
+    @staticmethod
+    def scan_phrase(text: str, terms: List[str]) -> tuple:
+        """Count and first token position of a phrase of any length in text, not spanning paragraph breaks"""
+        count, first_position, offset = 0, None, 0
+        width = len(terms)
+        for paragraph in PARAGRAPH_BREAK.split(text):
+            tokens = TERM_PATTERN.findall(paragraph.lower())
+            for i in range(len(tokens) - width + 1):
+                if tokens[i] == terms[0] and tokens[i:i + width] == terms:
+                    count += 1
+                    if first_position is None:
+                        first_position = offset + i
+            offset += len(tokens)
+        return count, first_position
+    
+    def phrase_stats(self, phrase: str, text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Count, density (% of words covered) and first position of a term or phrase.
+        Phrases longer than MAX_NGRAM words are measured by scanning text, the
+        text these stats were built from; without it they get no measurements.
+        """
+        terms = TERM_PATTERN.findall(phrase.lower())
+        count = self.count(phrase)
+        if count is not None:
+            first_position = self.first_positions.get(" ".join(terms))
+        elif terms and text is not None:
+            count, first_position = self.scan_phrase(text, terms)
+        else:
+            return {"count": None, "density": None, "first_position": None}
+        
+        return {
+            "count": count,
+            "density": round(count * len(terms) / self.token_count * 100, 2) if self.token_count else 0.0,
+            "first_position": first_position,
+            "first_position_ratio": round(first_position / self.token_count, 3) if first_position is not None else None
+        }
+    
+    def top(self, n: int = 1, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most frequent terms (n=1) or phrases (n=2, 3), skipping those that start or end with a stopword"""
+        top_terms = []
+        for phrase, count in self.ngrams[n - 1].most_common():
+            words = phrase.split(" ")
+            if words[0] in STOPWORDS or words[-1] in STOPWORDS or (n == 1 and len(phrase) < 3):
+                continue
+            top_terms.append({"term": phrase, "count": count})
+            if len(top_terms) == limit:
+                break
+        return top_terms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"token_count": self.token_count, "ngrams": self.ngrams, "first_positions": self.first_positions}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TermStats":
+        return cls(data["token_count"], data["ngrams"], data["first_positions"])
+
+# Corpus term index
+class CorpusIndex:
+    """
+    Document frequencies of the terms in stored search results (title and
+    description), for TF-IDF. Persisted as one flat file: a header, then term
+    offsets and document frequencies as uint32 arrays, then the sorted UTF-8
+    terms. The file is memory-mapped and looked up by binary search, so nothing
+    is loaded up front. Refreshed incrementally from the rows added since the
+    last build (rowid order).
+    """
+    
+    MAGIC = b"ZCT1"
+    HEADER = struct.Struct("<4s4xQQQ")  # magic, documents, last rowid, terms
+    
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.document_count = 0
+        self.last_rowid = 0
+        self.term_count = 0
+        self._file = None
+        self._buffer = None
+        self._offsets = None
+        self._dfs = None
+        self._terms = None
+    
+    def load(self):
+        """Map the persisted index, if there is a valid one"""
+        if not self.path or not os.path.exists(self.path) or os.path.getsize(self.path) < self.HEADER.size:
+            return
+        with open(self.path, "rb") as index_file:
+            buffer = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._attach(buffer)
+        except ValueError as e:
+            buffer.close()
+            logger.warning(f"Ignoring corpus index {self.path}: {e}")
+    
+    def close(self):
+        self._detach()
+    
+    def _attach(self, buffer):
+        magic, documents, last_rowid, terms = self.HEADER.unpack_from(buffer)
+        if magic != self.MAGIC:
+            raise ValueError("unknown format")
+        
+        view = memoryview(buffer)
+        offsets_start = self.HEADER.size
+        dfs_start = offsets_start + 4 * (terms + 1)
+        terms_start = dfs_start + 4 * terms
+        
+        self._detach()
+        self._buffer = buffer
+        self._offsets = view[offsets_start:dfs_start].cast("I")
+        self._dfs = view[dfs_start:terms_start].cast("I")
+        self._terms = view[terms_start:]
+        self.document_count, self.last_rowid, self.term_count = documents, last_rowid, terms
+    
+    def _detach(self):
+        for view in (self._offsets, self._dfs, self._terms):
+            if view is not None:
+                view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._buffer = self._offsets = self._dfs = self._terms = None
+        self.term_count = 0
+    
+    def _term(self, i: int) -> bytes:
+        return bytes(self._terms[self._offsets[i]:self._offsets[i + 1]])
+    
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed results containing the term"""
+        key = term.lower().encode()
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self._term(mid)
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return self._dfs[mid]
+        return 0
+    
+    def idf(self, term: str) -> float:
+        """BM25-style inverse document frequency, always positive"""
+        return self._idf(self.document_frequency(term))
+    
+    def _idf(self, df: int) -> float:
+        return math.log((self.document_count - df + 0.5) / (df + 0.5) + 1)
+    
+    def distinctive_terms(self, stats: "TermStats", limit: int = 10) -> List[Dict[str, Any]]:
+        """Terms of a text ranked by TF-IDF (sublinear tf) against the corpus; empty until the index is built"""
+        if not self.document_count:
+            return []
+        
+        scored = []
+        for term, count in stats.ngrams[0].items():
+            if term in STOPWORDS or len(term) < 3 or term.isdigit():
+                continue
+            df = self.document_frequency(term)
+            scored.append({"term": term, "count": count, "document_frequency": df, "score": round((1 + math.log(count)) * self._idf(df), 3)})
+        
+        return heapq.nlargest(limit, scored, key=lambda item: item["score"])
+    
+    @staticmethod
+    def _collect(conn: sqlite3.Connection, after_rowid: int, batch_size: int):
+        """Document frequencies of the next batch of rows added after after_rowid"""
+        rows = conn.execute(
+            "SELECT rowid, title, description FROM search_results WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (after_rowid, batch_size)
+        ).fetchall()
+        counts: Counter = Counter()
+        for rowid, title, description in rows:
+            counts.update({
+                term for term in TERM_PATTERN.findall(f"{title} {description or ''}".lower())
+                if len(term) <= 40
+            })
+        return counts, len(rows), rows[-1][0] if rows else after_rowid
+    
+    def _build(self, counts: Counter, documents: int, last_rowid: int) -> bytes:
+        """Serialize the current index merged with new document frequencies"""
+        merged = Counter({self._term(i): self._dfs[i] for i in range(self.term_count)})
+        merged.update({term.encode(): df for term, df in counts.items()})
+        terms = sorted(merged)
+        
+        offsets = array("I", [0])
+        for term in terms:
+            offsets.append(offsets[-1] + len(term))
+        dfs = array("I", (merged[term] for term in terms))
+        header = self.HEADER.pack(self.MAGIC, self.document_count + documents, last_rowid, len(terms))
+        return header + offsets.tobytes() + dfs.tobytes() + b"".join(terms)
+    
+    def _write(self, data: bytes):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as index_file:
+            index_file.write(data)
+        os.replace(temp_path, self.path)
+    
+    async def refresh(self) -> int:
+        """Index the results stored since the last refresh; returns how many were added"""
+        counts: Counter = Counter()
+        documents, last_rowid = 0, self.last_rowid
+        # One database call per batch, so a large backlog doesn't hold the database thread
+        while True:
+            batch_counts, batch_documents, last_rowid = await db.run(
+                self._collect, last_rowid, config.CORPUS_INDEX_BATCH_SIZE
+            )
+            counts.update(batch_counts)
+            documents += batch_documents
+            if batch_documents < config.CORPUS_INDEX_BATCH_SIZE:
+                break
+        if not documents:
+            return 0
+        
+        # Merging and writing touch the whole vocabulary: keep them off the event loop
+        data = await asyncio.to_thread(self._build, counts, documents, last_rowid)
+        if self.path:
+            await asyncio.to_thread(self._write, data)
+            self.load()
+        else:
+            self._attach(data)
+        
+        logger.info(f"Corpus index: {documents} new results, {self.document_count} total, {self.term_count} terms")
+        return documents
+
+def corpus_index_path() -> Optional[str]:
+    """File for the corpus index: CORPUS_INDEX_PATH, else next to a file database, else memory only"""
+    if config.CORPUS_INDEX_PATH:
+        return config.CORPUS_INDEX_PATH
+    path = database_path(config.DATABASE_URL)
+    return None if path.startswith("file:") else f"{path}.terms"
+
+corpus_index = CorpusIndex(corpus_index_path())
+
+async def run_corpus_indexing(interval: float):
+    """Keep the corpus index up to date with newly stored results"""
+    while True:
+        try:
+            await corpus_index.refresh()
+        except Exception as e:
+            logger.error(f"Corpus indexing error: {e}")
+        await asyncio.sleep(interval)
+
 # SEO Service
 class SEOService:
+    # Taxonomy categories whose keywords extend a built-in category instead of adding a new one
+    TAXONOMY_CATEGORY_ALIASES = {
+        "ai-ml": "ai",
+        "cybersecurity": "security",
+        "web-development": "web",
+        "mobile-development": "mobile",
+        "cloud-computing": "cloud",
+        "data-science": "data"
+    }
+    # Seconds a worker may hold a draft while applying an edit
+    DRAFT_LOCK_TTL = 10.0
+    
     def __init__(self):
         self.italian_keywords = {
             "ai": ["intelligenza artificiale", "AI", "machine learning", "deep learning", "reti neurali"],
@@ -459,19 +1661,159 @@ class SEOService:
             "cloud": ["cloud computing", "AWS", "Azure", "Google Cloud", "serverless"],
             "data": ["data science", "big data", "analytics", "visualizzazione dati"]
         }
+        # Built-in keywords merged with the taxonomy's, and display names of taxonomy-only categories
+        self.category_keywords: Dict[str, List[str]] = dict(self.italian_keywords)
+        self.category_names: Dict[str, str] = {}
+        self.keyword_matcher = KeywordMatcher(self.category_keywords)
+        self._taxonomy_loaded_at: Optional[float] = None
+    
+    async def get_keyword_matcher(self) -> KeywordMatcher:
+        """Matcher over the built-in keywords plus the taxonomy's categories.keywords, reloaded every CACHE_TTL"""
+        now = time.monotonic()
+        if self._taxonomy_loaded_at is None or now - self._taxonomy_loaded_at > config.CACHE_TTL:
+            self._taxonomy_loaded_at = now
+            try:
+                rows = await db.fetchall("SELECT id, name, keywords FROM categories WHERE keywords IS NOT NULL")
+                category_keywords = {category: list(words) for category, words in self.italian_keywords.items()}
+                category_names = {}
+                for category_id, name, keywords in rows:
+                    category = self.TAXONOMY_CATEGORY_ALIASES.get(category_id, category_id)
+                    words = category_keywords.setdefault(category, [])
+                    known = {word.lower() for word in words}
+                    for word in keywords.split(","):
+                        word = word.strip()
+                        if word and word.lower() not in known:
+                            known.add(word.lower())
+                            words.append(word)
+                    if category not in self.italian_keywords:
+                        category_names[category] = name
+                self.category_keywords, self.category_names = category_keywords, category_names
+                self.keyword_matcher = KeywordMatcher(category_keywords)
+            except Exception as e:
+                logger.error(f"Error loading taxonomy keywords: {e}")
+        return self.keyword_matcher
+    
+    async def analyze_content(self, content: str) -> Dict[str, Any]:
+        """Content-only analysis (keyword hits, categories, term statistics), independent of the request options"""
+        # One pass finds every keyword of every category
+        matcher = await self.get_keyword_matcher()
+        keyword_hits = matcher.scan(content)
+        return {
+            "keyword_hits": keyword_hits,
+            "category_hits": matcher.label_counts(keyword_hits),
+            "term_stats": TermStats.from_text(content).to_dict()
+        }
+    
+    async def get_content_analysis(self, content: str) -> Dict[str, Any]:
+        """Content analysis, cached by content so keyword, language and type variations reuse it"""
+        cache_key = cache_fingerprint("seo-content", {"content": content_digest(content)})
+        analysis = await get_cached_result(cache_key)
+        if analysis is None:
+            analysis = await self.analyze_content(content)
+            await set_cached_result(cache_key, analysis)
+        return analysis
+    
+    async def analyze_paragraph(self, text: str) -> Dict[str, Any]:
+        """analyze_content for a single paragraph, in the form merge_paragraph_analyses combines"""
+        matcher = await self.get_keyword_matcher()
+        return {"keyword_hits": matcher.scan(text), "term_stats": TermStats.from_text(text).to_dict()}
+    
+    def merge_paragraph_analyses(self, paragraphs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analysis of the paragraphs joined by PARAGRAPH_SEPARATOR, built from their own analyses"""
+        stats = TermStats()
+        keyword_hits: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        
+        for paragraph in paragraphs:
+            stats.merge(TermStats.from_dict(paragraph["analysis"]["term_stats"]))
+            for key, hit in paragraph["analysis"]["keyword_hits"].items():
+                merged = keyword_hits.setdefault(key, {"keyword": hit["keyword"], "count": 0, "positions": []})
+                merged["count"] += hit["count"]
+                merged["positions"].extend(offset + position for position in hit["positions"])
+            offset += len(paragraph["text"]) + len(PARAGRAPH_SEPARATOR)
+        
+        return {
+            "keyword_hits": keyword_hits,
+            "category_hits": self.keyword_matcher.label_counts(keyword_hits),
+            "term_stats": stats.to_dict()
+        }
+    
+    async def update_draft(
+        self,
+        document_id: str,
+        paragraph_count: int,
+        edits: Dict[int, str],
+        target_keywords: List[str] = None,
+        revision: Optional[int] = None
+    ):
+        """
+        Apply paragraph edits to a cached draft and regenerate its suggestions,
+        analyzing only the paragraphs whose text changed. Returns the suggestions,
+        the number of paragraphs analyzed and the draft's new revision. Raises
+        LookupError when the draft is not cached (or expired) and the edits do not
+        cover every paragraph, when revision is not the draft's current one (or is
+        missing from a partial edit), and while another worker updates the draft.
+        """
+        state_key = cache_fingerprint("seo-draft", {"document_id": document_id})
+        lock_key = f"lock:{state_key}"
+        token = uuid.uuid4().hex
+        if await redis_cache.acquire_lock(lock_key, token, ttl=self.DRAFT_LOCK_TTL) is False:
+            raise LookupError(f"Draft {document_id} is being updated by another request")
+        try:
+            return await self._update_draft(state_key, document_id, paragraph_count, edits, target_keywords, revision)
+        finally:
+            await redis_cache.release_lock(lock_key, token)
+    
+    async def _update_draft(self, state_key: str, document_id: str, paragraph_count: int, edits: Dict[int, str], target_keywords: Optional[List[str]], revision: Optional[int]):
+        # Shared tier only: another worker may have applied the previous edit
+        state = await get_shared_result(state_key)
+        current_revision = state.get("revision", 0) if state else 0
+        if state and revision is None and len(edits) < paragraph_count:
+            raise LookupError(f"Draft {document_id} edits must carry the revision of the last update")
+        if state and revision is not None and revision != current_revision:
+            raise LookupError(f"Draft {document_id} is at revision {current_revision}, not {revision}")
+        
+        paragraphs = list(state["paragraphs"][:paragraph_count]) if state else []
+        paragraphs += [None] * (paragraph_count - len(paragraphs))
+        
+        analyzed = 0
+        for index, text in edits.items():
+            digest = content_digest(text)
+            if paragraphs[index] is None or paragraphs[index]["digest"] != digest:
+                paragraphs[index] = {"text": text, "digest": digest, "analysis": await self.analyze_paragraph(text)}
+                analyzed += 1
+        
+        missing = [index for index, paragraph in enumerate(paragraphs) if paragraph is None]
+        if missing:
+            raise LookupError(f"Draft {document_id} has no text for paragraphs {missing[:10]}")
+        
+        revision = current_revision + 1
+        await set_shared_result(state_key, {"paragraphs": paragraphs, "revision": revision})
+        
+        content = PARAGRAPH_SEPARATOR.join(paragraph["text"] for paragraph in paragraphs)
+        if config.MOCK_MODE:
+            return self._get_mock_seo_suggestions(content), analyzed, revision
+        
+        await self.get_keyword_matcher()
+        analysis = self.merge_paragraph_analyses(paragraphs)
+        return await self.suggestions_from_analysis(content, analysis, target_keywords), analyzed, revision
     
     async def generate_suggestions(self, content: str, target_keywords: List[str] = None) -> SEOSuggestion:
         """Generate SEO suggestions for content"""
         if config.MOCK_MODE:
             return self._get_mock_seo_suggestions(content)
         
-        # Analyze content
-        content_lower = content.lower()
-        detected_categories = []
-        
-        for category, keywords in self.italian_keywords.items():
-            if any(keyword.lower() in content_lower for keyword in keywords):
-                detected_categories.append(category)
+        analysis = await self.get_content_analysis(content)
+        return await self.suggestions_from_analysis(content, analysis, target_keywords)
+    
+    async def suggestions_from_analysis(self, content: str, analysis: Dict[str, Any], target_keywords: List[str] = None) -> SEOSuggestion:
+        """Generate SEO suggestions from the content analysis"""
+        keyword_hits = analysis["keyword_hits"]
+        category_hits = analysis["category_hits"]
+        detected_categories = sorted(
+            (category for category in self.category_keywords if category in category_hits),
+            key=lambda category: -category_hits[category]
+        )
         
         # Generate title suggestions
         titles = await self._generate_titles(content, target_keywords, detected_categories)
@@ -483,7 +1825,14 @@ class SEOService:
         outline = await self._generate_content_outline(content, detected_categories)
         
         # Keyword analysis
-        keyword_analysis = await self._analyze_keywords(content, target_keywords, detected_categories)
+        keyword_analysis = await self._analyze_keywords(
+            content, target_keywords, detected_categories, TermStats.from_dict(analysis["term_stats"])
+        )
+        keyword_analysis["category_hits"] = category_hits
+        keyword_analysis["keyword_hits"] = {
+            hit["keyword"]: {"count": hit["count"], "positions": hit["positions"]}
+            for hit in keyword_hits.values()
+        }
         
         # Calculate SEO score
         seo_score = self._calculate_seo_score(content, titles, meta_descriptions)
@@ -521,7 +1870,7 @@ class SEOService:
         
         titles = []
         for category in categories[:2]:  # Limit to 2 categories
-            term = category_terms.get(category, "Tecnologia")
+            term = category_terms.get(category) or self.category_names.get(category, "Tecnologia")
             for base in base_titles[:3]:  # Limit base titles
                 titles.append(f"{term}: {base}")
         
@@ -558,8 +1907,10 @@ class SEOService:
         
         return outline[:6]  # Return 6 sections
     
-    async def _analyze_keywords(self, content: str, keywords: List[str], categories: List[str]) -> Dict[str, Any]:
-        """Analyze keywords and competition"""
+    async def _analyze_keywords(self, content: str, keywords: List[str], categories: List[str], stats: Optional[TermStats] = None) -> Dict[str, Any]:
+        """Analyze keyword usage measured on the content"""
+        stats = stats or TermStats.from_text(content)
+        keywords = keywords or []
         analysis = {
             "primary_keywords": [],
             "secondary_keywords": [],
@@ -568,30 +1919,30 @@ class SEOService:
             "competition_analysis": {}
         }
         
-        # Mock keyword data
         for category in categories:
-            if category in self.italian_keywords:
-                category_keywords = self.italian_keywords[category]
+            if category in self.category_keywords:
+                category_keywords = self.category_keywords[category]
                 analysis["primary_keywords"].extend(category_keywords[:2])
                 analysis["secondary_keywords"].extend(category_keywords[2:4])
         
-        # Generate long-tail keywords
-        for kw in keywords[:3]:
-            analysis["long_tail_keywords"].extend([
-                f"come funziona {kw}",
-                f"{kw} esempi pratici",
-                f"guida {kw} 2025",
-                f"migliori {kw} tools"
-            ])
+        # Long-tail candidates: the content's most frequent phrases, those around the target keywords first
+        keyword_terms = {term for kw in keywords for term in TERM_PATTERN.findall(kw.lower())}
+        phrases = stats.top(3, limit=20) + stats.top(2, limit=20)
+        phrases.sort(key=lambda phrase: not keyword_terms.intersection(phrase["term"].split(" ")))
+        analysis["long_tail_keywords"] = [phrase["term"] for phrase in phrases if phrase["count"] > 1][:10]
         
-        # Mock keyword metrics
-        for kw in analysis["primary_keywords"]:
-            analysis["keyword_density"][kw] = {
-                "volume": 15000 + hash(kw) % 10000,
-                "difficulty": 45 + hash(kw) % 40,
-                "cpc": 1.50 + (hash(kw) % 200) / 100,
-                "trend": "↗ +25%"
-            }
+        for kw in dict.fromkeys(keywords + analysis["primary_keywords"]):
+            analysis["keyword_density"][kw] = stats.phrase_stats(kw, content)
+        
+        analysis["distinctive_keywords"] = corpus_index.distinctive_terms(stats)
+        
+        analysis["term_statistics"] = {
+            "total_words": stats.token_count,
+            "unique_words": len(stats.ngrams[0]),
+            "top_terms": stats.top(1),
+            "top_bigrams": stats.top(2),
+            "top_trigrams": stats.top(3)
+        }
         
         return analysis
     
@@ -725,13 +2076,35 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting ZeroCrash backend...")
-    init_db()
+    await db.run(create_schema)
+    search_writer.start()
+    maintenance_task = asyncio.create_task(run_db_maintenance(config.DB_MAINTENANCE_INTERVAL))
+    corpus_index.load()
+    indexing_task = asyncio.create_task(run_corpus_indexing(config.CORPUS_INDEX_INTERVAL))
     logger.info("Database initialized")
-    
+
+    global http_client
+    http_client = create_http_client()
+    for provider in (google_news_client, youtube_client, reddit_client):
+        provider.http_client = http_client
+    logger.info("HTTP client pool initialized")
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down ZeroCrash backend...")
+    for provider in (google_news_client, youtube_client, reddit_client):
+        provider.http_client = None
+    await http_client.aclose()
+    http_client = None
+    await redis_cache.close()
+    # Drain pending writes, then let the background tasks finish cancelling before closing what they use
+    await search_writer.stop()
+    maintenance_task.cancel()
+    indexing_task.cancel()
+    await asyncio.gather(maintenance_task, indexing_task, return_exceptions=True)
+    corpus_index.close()
+    db.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -751,191 +2124,944 @@ app.add_middleware(
 )
 
 # Helper functions
+# "local" answers from the full-text index of previously stored results
+SEARCH_SOURCES = ["google_news", "youtube", "reddit", "local"]
+
+# Results fetched per source, independent of the requested sources so cache entries can be shared
+SOURCE_RESULT_LIMIT = 20
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so equivalent spellings share cache entries"""
+    return " ".join(query.split()).casefold()
+
+def cache_fingerprint(namespace: str, params: Dict[str, Any]) -> str:
+    """Stable cache key for the given parameters, identical across processes and restarts"""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f"{namespace}:{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+def content_digest(content: str) -> str:
+    """Content address of a text"""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def seo_fingerprint(request: SEOSuggestionRequest) -> str:
+    """Canonical fingerprint of an SEO suggestion request"""
+    return cache_fingerprint("seo", {
+        "content": content_digest(request.content),
+        "target_keywords": [" ".join(keyword.split()) for keyword in request.target_keywords],
+        "language": request.language,
+        "content_type": request.content_type
+    })
+
+def search_fingerprint(request: SearchRequest) -> str:
+    """Canonical fingerprint of a search request"""
+    return cache_fingerprint("search", {
+        "query": normalize_query(request.query),
+        "sources": sorted(set(request.sources)),
+        "category": request.category,
+        "date_range": request.date_range,
+        "popularity_threshold": request.popularity_threshold,
+        "max_results": request.max_results,
+        "sort": request.sort
+    })
+
+def parse_utc_timestamp(value: str) -> datetime:
+    """Parse a provider ISO 8601 timestamp (fromisoformat only accepts a trailing "Z" from Python 3.11)"""
+    if value[-1:] == "Z":
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+# Provider items are converted straight into SearchResult fields, so the models
+# are built with model_construct instead of being validated a second time. The
+# fields that construction would not check are guarded here instead, so a
+# malformed item is skipped rather than failing the whole search later.
+
+def _required_text(value: Any, field: str) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"missing {field}")
+    return value
+
+def _normalize_google_news(result: Dict) -> SearchResult:
+    url = _required_text(result.get("url"), "url")
+    return SearchResult.model_construct(
+        id=hashlib.md5(url.encode()).hexdigest(),
+        title=_required_text(result.get("title"), "title"),
+        description=result.get("description") or "",
+        url=url,
+        source="Google News",
+        author=(result.get("source") or {}).get("name"),
+        published_at=parse_utc_timestamp(result["publishedAt"]),
+        engagement={"views": 0, "shares": 0},
+        category=None,
+        tags=[]
+    )
+
+def _normalize_youtube(result: Dict) -> SearchResult:
+    video_id = _required_text(result["id"].get("videoId"), "videoId")
+    snippet = result["snippet"]
+    stats = result.get("statistics", {})
+    return SearchResult.model_construct(
+        id=video_id,
+        title=_required_text(snippet.get("title"), "title"),
+        description=snippet.get("description") or "",
+        url=f"https://youtube.com/watch?v={video_id}",
+        source="YouTube",
+        author=snippet["channelTitle"],
+        published_at=parse_utc_timestamp(snippet["publishedAt"]),
+        engagement={
+            "views": int(stats.get("viewCount", 0)),
+            "likes": int(stats.get("likeCount", 0)),
+            "comments": int(stats.get("commentCount", 0))
+        },
+        category=None,
+        tags=[]
+    )
+
+def _normalize_reddit(result: Dict) -> SearchResult:
+    data = result["data"]
+    selftext = data.get("selftext") or ""
+    return SearchResult.model_construct(
+        id=hashlib.md5(_required_text(data.get("url"), "url").encode()).hexdigest(),
+        title=_required_text(data.get("title"), "title"),
+        description=selftext[:200] + "..." if len(selftext) > 200 else selftext,
+        url=f"https://reddit.com{data['permalink']}" if data.get("permalink") else data["url"],
+        source="Reddit",
+        author=data["author"],
+        published_at=datetime.fromtimestamp(data["created_utc"], tz=timezone.utc),
+        engagement={
+            "score": data["score"],
+            "upvote_ratio": data.get("upvote_ratio", 0),
+            "comments": data["num_comments"]
+        },
+        category=data["subreddit"],
+        tags=[]
+    )
+
+RESULT_NORMALIZERS: Dict[str, Callable[[Dict], SearchResult]] = {
+    "google_news": _normalize_google_news,
+    "youtube": _normalize_youtube,
+    "reddit": _normalize_reddit,
+}
+
 def normalize_search_results(results: List[Dict], source: str) -> List[SearchResult]:
     """Normalize search results from different sources"""
-    normalized = []
+    normalizer = RESULT_NORMALIZERS.get(source)
+    if normalizer is None:
+        return []
     
+    normalized = []
     for result in results:
         try:
-            if source == "google_news":
-                normalized.append(SearchResult(
-                    id=hashlib.md5(result["url"].encode()).hexdigest(),
-                    title=result["title"],
-                    description=result["description"],
-                    url=result["url"],
-                    source="Google News",
-                    author=result.get("source", {}).get("name"),
-                    published_at=datetime.fromisoformat(result["publishedAt"].replace("Z", "+00:00")),
-                    engagement={"views": 0, "shares": 0},
-                    category=None,
-                    tags=[]
-                ))
-            
-            elif source == "youtube":
-                stats = result.get("statistics", {})
-                normalized.append(SearchResult(
-                    id=result["id"]["videoId"],
-                    title=result["snippet"]["title"],
-                    description=result["snippet"]["description"],
-                    url=f"https://youtube.com/watch?v={result['id']['videoId']}",
-                    source="YouTube",
-                    author=result["snippet"]["channelTitle"],
-                    published_at=datetime.fromisoformat(result["snippet"]["publishedAt"].replace("Z", "+00:00")),
-                    engagement={
-                        "views": int(stats.get("viewCount", 0)),
-                        "likes": int(stats.get("likeCount", 0)),
-                        "comments": int(stats.get("commentCount", 0))
-                    },
-                    category=None,
-                    tags=[]
-                ))
-            
-            elif source == "reddit":
-                data = result["data"]
-                normalized.append(SearchResult(
-                    id=hashlib.md5(data["url"].encode()).hexdigest(),
-                    title=data["title"],
-                    description=data["selftext"][:200] + "..." if len(data["selftext"]) > 200 else data["selftext"],
-                    url=f"https://reddit.com{data.get('permalink', '')}",
-                    source="Reddit",
-                    author=data["author"],
-                    published_at=datetime.fromtimestamp(data["created_utc"]),
-                    engagement={
-                        "score": data["score"],
-                        "upvote_ratio": data.get("upvote_ratio", 0),
-                        "comments": data["num_comments"]
-                    },
-                    category=data["subreddit"],
-                    tags=[]
-                ))
-                
+            normalized.append(normalizer(result))
         except Exception as e:
             logger.error(f"Error normalizing {source} result: {e}")
-            continue
     
     return normalized
 
-def save_search_results(query: str, results: List[SearchResult]):
+# Ranking
+ENGAGEMENT_WEIGHTS = {"views": 1.0, "likes": 10.0, "shares": 10.0, "score": 10.0, "comments": 20.0}
+
+def _utc_timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _raw_engagement(result: SearchResult) -> float:
+    total = 0.0
+    for field, weight in ENGAGEMENT_WEIGHTS.items():
+        value = result.engagement.get(field)
+        if isinstance(value, (int, float)) and value > 0:
+            total += value * weight
+    return math.log1p(total)
+
+def normalized_engagement(results: List[SearchResult]) -> Dict[int, float]:
+    """Engagement scaled to 0..1 within each source, since views, upvotes and shares are not comparable"""
+    raw = {id(result): _raw_engagement(result) for result in results}
+    
+    source_max: Dict[str, float] = {}
+    for result in results:
+        source_max[result.source] = max(source_max.get(result.source, 0.0), raw[id(result)])
+    
+    return {
+        id(result): raw[id(result)] / source_max[result.source] if source_max[result.source] else 0.0
+        for result in results
+    }
+
+def query_match(terms: set, result: SearchResult) -> float:
+    """Share of query terms found in the title (weighted higher) and description"""
+    if not terms:
+        return 0.0
+    title_terms = set(re.findall(r"\w+", result.title.casefold()))
+    description_terms = set(re.findall(r"\w+", result.description.casefold()))
+    return (0.7 * len(terms & title_terms) + 0.3 * len(terms & description_terms)) / len(terms)
+
+def rank_results(results: List[SearchResult], query: str, sort: str, k: int) -> List[SearchResult]:
+    """
+    Select the top k results for the requested ordering with a heap instead of a full sort.
+    "relevance" blends query-term match, recency decay and per-source engagement.
+    """
+    if sort == "date":
+        return heapq.nlargest(k, results, key=lambda result: _utc_timestamp(result.published_at))
+    
+    engagement = normalized_engagement(results)
+    if sort == "engagement":
+        return heapq.nlargest(k, results, key=lambda result: engagement[id(result)])
+    
+    terms = set(re.findall(r"\w+", query.casefold()))
+    now = time.time()
+    decay = math.log(2) / (config.RANK_RECENCY_HALF_LIFE_HOURS * 3600)
+    
+    def relevance(result: SearchResult) -> float:
+        age = max(now - _utc_timestamp(result.published_at), 0.0)
+        return (
+            config.RANK_WEIGHT_MATCH * query_match(terms, result)
+            + config.RANK_WEIGHT_RECENCY * math.exp(-decay * age)
+            + config.RANK_WEIGHT_ENGAGEMENT * engagement[id(result)]
+        )
+    
+    return heapq.nlargest(k, results, key=relevance)
+
+# Deduplication
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src", "feature", "si"}
+
+def canonical_url(url: str) -> str:
+    """Canonical form of a URL: no scheme, www., fragment, tracking parameters or trailing slash"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m.", "old."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = parts.path.rstrip("/")
+    
+    if host == "youtu.be":
+        host, query = "youtube.com", [("v", path.lstrip("/"))]
+        path = "/watch"
+    else:
+        query = [
+            (key, value)
+            for key, value in parse_qsl(parts.query)
+            if not key.startswith("utm_") and key not in TRACKING_PARAMS
+        ]
+    
+    return f"{host}{path}?{urlencode(sorted(query))}" if query else f"{host}{path}"
+
+def dedup_keys(result: SearchResult) -> List[str]:
+    """Keys identifying the same story: the id, and the canonical URL unless it names no page"""
+    url = canonical_url(result.url)
+    # An empty or host-only URL (e.g. a Reddit post without a permalink) would merge unrelated results
+    return [result.id, url] if "/" in url or "?" in url else [result.id]
+
+# SimHash bit counts are summed in one big integer: bit i of a feature's hash
+# becomes a 1 in 16-bit lane i, so adding the spread hashes counts every bit at once
+_SIMHASH_LANES = [
+    int.from_bytes(bytes(value for bit in range(7, -1, -1) for value in (0, byte >> bit & 1)), "big")
+    for byte in range(256)
+]
+_SIMHASH_MAX_FEATURES = 0xFFFF
+
+@functools.lru_cache(maxsize=16384)
+def _simhash_feature(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    spread = 0
+    for byte in digest:
+        spread = spread << 128 | _SIMHASH_LANES[byte]
+    return spread
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash over character 4-grams; None when the text is too short to compare reliably"""
+    words = re.findall(r"\w+", text.casefold())
+    if len(words) < config.DEDUP_MIN_WORDS:
+        return None
+    normalized = " ".join(words)
+    feature_count = min(len(normalized) - 3, _SIMHASH_MAX_FEATURES)
+    
+    total = sum(_simhash_feature(normalized[i:i + 4]) for i in range(feature_count))
+    counts = total.to_bytes(128, "little")
+    # A bit is set when more features have it set than not
+    return sum(
+        1 << bit
+        for bit in range(64)
+        if 2 * int.from_bytes(counts[2 * bit:2 * bit + 2], "little") > feature_count
+    )
+
+def result_fingerprints(results: List[SearchResult]) -> Dict[str, Optional[int]]:
+    """SimHash of each result's text by id, computed once when a source page is loaded"""
+    return {result.id: simhash(f"{result.title} {result.description}") for result in results}
+
+def page_fingerprints(pages: Any) -> Dict[str, Optional[int]]:
+    """Fingerprints carried by a collection of source pages"""
+    return {
+        result_id: fingerprint
+        for page in pages
+        for result_id, fingerprint in (getattr(page, "fingerprints", None) or {}).items()
+    }
+
+def collapse_duplicates(results: List[SearchResult], fingerprints: Optional[Dict[str, Optional[int]]] = None) -> List[SearchResult]:
+    """
+    Cluster results with the same canonical URL or near-identical text (SimHash
+    within DEDUP_MAX_DISTANCE bits) and keep one representative per cluster,
+    listing the others under duplicates. fingerprints holds SimHashes already
+    computed by result id; the others are computed here.
+    """
+    fingerprints = fingerprints or {}
+    parent = list(range(len(results)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    def union(i: int, j: int):
+        parent[find(i)] = find(j)
+    
+    by_url: Dict[str, int] = {}
+    for i, result in enumerate(results):
+        for key in dedup_keys(result):
+            if key in by_url:
+                union(i, by_url[key])
+            else:
+                by_url[key] = i
+    
+    # LSH: 4 bands of 16 bits, so hashes within 3 bits always share at least one band
+    hashes = [
+        fingerprints[result.id] if result.id in fingerprints else simhash(f"{result.title} {result.description}")
+        for result in results
+    ]
+    bands: Dict[tuple, List[int]] = {}
+    for i, fingerprint in enumerate(hashes):
+        if fingerprint is None:
+            continue
+        for band in range(4):
+            key = (band, fingerprint >> (band * 16) & 0xFFFF)
+            for j in bands.get(key, []):
+                if find(i) != find(j) and bin(fingerprint ^ hashes[j]).count("1") <= config.DEDUP_MAX_DISTANCE:
+                    union(i, j)
+            bands.setdefault(key, []).append(i)
+    
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(results)):
+        clusters.setdefault(find(i), []).append(i)
+    
+    collapsed = []
+    for members in clusters.values():
+        if len(members) == 1:
+            collapsed.append(results[members[0]])
+            continue
+        
+        # Representative: most engagement, then the fullest description
+        best = max(members, key=lambda i: (_raw_engagement(results[i]), len(results[i].description)))
+        duplicates = [
+            {"id": results[i].id, "url": results[i].url, "source": results[i].source}
+            for i in members if i != best
+        ]
+        collapsed.append(results[best].copy(update={"duplicates": duplicates}))
+    
+    return collapsed
+
+async def save_search_results(query: str, results: List[SearchResult]):
     """Save search results to database"""
+    rows = [
+        (
+            result.id,
+            query,
+            result.title,
+            result.description,
+            result.url,
+            result.source,
+            result.author,
+            result.published_at,
+            json.dumps(result.engagement, separators=(",", ":")),
+            result.category,
+            ",".join(result.tags),
+            datetime.now()
+        )
+        for result in results
+    ]
+    
     try:
-        conn = sqlite3.connect("zerocrash.db")
-        for result in results:
-            conn.execute("""
-                INSERT OR REPLACE INTO search_results 
-                (id, query, title, description, url, source, author, published_at, engagement_data, category, tags, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                result.id,
-                query,
-                result.title,
-                result.description,
-                result.url,
-                result.source,
-                result.author,
-                result.published_at,
-                str(result.engagement),
-                result.category,
-                ",".join(result.tags),
-                datetime.now()
-            ))
-        conn.commit()
-        conn.close()
+        if search_writer.running:
+            await search_writer.put(rows)
+        else:
+            await db.run(insert_search_result_rows, rows)
     except Exception as e:
         logger.error(f"Error saving search results: {e}")
 
-async def get_cached_result(cache_key: str):
-    """Get result from cache"""
-    return memory_cache.get(cache_key)
-
-def set_cached_result(cache_key: str, result: Any):
-    """Set result in cache"""
-    memory_cache[cache_key] = result
+def fts_match_query(query: str) -> str:
+    """FTS5 MATCH expression requiring every term of the query"""
+    terms = re.findall(r"\w+", query.casefold())
+    return " ".join(f'"{term}"' for term in terms)
 
-# API Endpoints
+def _search_local_rows(conn: sqlite3.Connection, match: str, since: datetime, limit: int, offset: int = 0) -> List[tuple]:
+    return conn.execute("""
+        SELECT r.id, r.title, r.description, r.url, r.source, r.author, r.published_at,
+               r.engagement_data, r.category, r.tags
+        FROM search_results_fts
+        JOIN search_results r ON r.rowid = search_results_fts.rowid
+        WHERE search_results_fts MATCH ? AND r.published_at >= ?
+        ORDER BY bm25(search_results_fts, 10.0, 5.0, 1.0, 2.0)
+        LIMIT ? OFFSET ?
+    """, (match, since, limit, offset)).fetchall()
 
-@app.post("/api/search", response_model=Dict[str, Any])
-async def search_content(request: SearchRequest, background_tasks: BackgroundTasks):
-    """
-    Search for IT content across multiple sources
-    """
-    # Generate cache key
-    cache_key = f"search:{hash(str(request.dict()))}"
+async def search_local_index(request: SearchRequest, offset: int = 0) -> List[SearchResult]:
+    """Answer a search from the full-text index of stored results, ranked by BM25"""
+    match = fts_match_query(request.query)
+    if not match:
+        return ResultPage()
     
-    # Check cache first
-    cached_result = await get_cached_result(cache_key)
-    if cached_result:
-        return cached_result
+    since = datetime.now(timezone.utc) - timedelta(days=search_days(request))
+    rows = await db.run(_search_local_rows, match, since, request.max_results, offset)
+    next_offset = offset + len(rows) if len(rows) == request.max_results else None
     
-    all_results = []
+    return ResultPage([
+        SearchResult(
+            id=row[0],
+            title=row[1],
+            description=row[2] or "",
+            url=row[3],
+            source=row[4],
+            author=row[5],
+            published_at=row[6],
+            engagement=json.loads(row[7]) if row[7] else {},
+            category=row[8],
+            tags=[tag for tag in (row[9] or "").split(",") if tag]
+        )
+        for row in rows
+    ], next_page=next_offset)
+
+def search_days(request: SearchRequest) -> int:
+    """Date window, in days, requested by a search"""
+    return 7 if request.date_range == "week" else 30
+
+def source_cache_key(source: str, request: SearchRequest, page_token: Any = None) -> str:
+    """Cache key for one page of a source's results, covering only the parameters that source honours"""
+    params = {"query": normalize_query(request.query), "limit": SOURCE_RESULT_LIMIT, "page": page_token}
+    if source == "google_news":
+        params.update(category=request.category, days=search_days(request))
+    return cache_fingerprint(f"source:{source}", params)
+
+async def search_source(source: str, request: SearchRequest, page_token: Any = None) -> ResultPage:
+    """Fetch and normalize one page of results from a single source"""
+    if source == "google_news":
+        raw_results = await google_news_client.search(
+            query=request.query,
+            category=request.category,
+            days=search_days(request),
+            page=page_token or 1
+        )
+    elif source == "youtube":
+        raw_results = await youtube_client.search(
+            query=request.query,
+            max_results=SOURCE_RESULT_LIMIT,
+            page_token=page_token
+        )
+    elif source == "reddit":
+        raw_results = await reddit_client.search(query=request.query, limit=SOURCE_RESULT_LIMIT, after=page_token)
+    elif source == "local":
+        return await search_local_index(request, offset=page_token or 0)
+    else:
+        raise ValueError(f"Unsupported source: {source}")
     
-    # Search Google News
-    if "google_news" in request.sources:
-        try:
-            news_results = await google_news_client.search(
-                query=request.query,
-                category=request.category,
-                days=7 if request.date_range == "week" else 30
-            )
-            normalized_news = normalize_search_results(news_results, "google_news")
-            all_results.extend(normalized_news)
-        except Exception as e:
-            logger.error(f"Google News search error: {e}")
+    results = normalize_search_results(raw_results, source)
+    return ResultPage(
+        results,
+        next_page=getattr(raw_results, "next_page", None),
+        complete=getattr(raw_results, "complete", True),
+        fingerprints=result_fingerprints(results)
+    )
+
+async def cached_search_source(source: str, request: SearchRequest, page_token: Any = None):
+    """Search a single source through the per-source results cache"""
+    if source == "local":
+        # The local index already answers in milliseconds and sees new rows immediately
+        return await search_source(source, request, page_token), "bypass"
     
-    # Search YouTube
-    if "youtube" in request.sources:
-        try:
-            youtube_results = await youtube_client.search(
-                query=request.query,
-                max_results=min(request.max_results // len(request.sources), 20)
-            )
-            normalized_youtube = normalize_search_results(youtube_results, "youtube")
-            all_results.extend(normalized_youtube)
-        except Exception as e:
-            logger.error(f"YouTube search error: {e}")
+    async def load():
+        page = await search_source(source, request, page_token)
+        return {
+            "results": list(page),
+            "next_page": page.next_page,
+            "complete": page.complete,
+            # Hashed once per page load, so cache hits never recompute them
+            "fingerprints": page.fingerprints
+        }
     
-    # Search Reddit
-    if "reddit" in request.sources:
-        try:
-            reddit_results = await reddit_client.search(query=request.query)
-            normalized_reddit = normalize_search_results(reddit_results, "reddit")
-            all_results.extend(normalized_reddit)
-        except Exception as e:
-            logger.error(f"Reddit search error: {e}")
+    cached_page, cache_state = await get_cached_or_load(
+        source_cache_key(source, request, page_token), load,
+        # A page missing part of its source is served once but not cached
+        cacheable=lambda page: page["complete"]
+    )
+    # Models when served from this process, plain dicts when read back from Redis
+    results = ResultPage(
+        search_results_adapter.validate_python(cached_page["results"]),
+        next_page=cached_page["next_page"],
+        fingerprints=cached_page.get("fingerprints")
+    )
+    return results, cache_state
+
+async def _timed_source_search(source: str, request: SearchRequest, page_token: Any = None):
+    """Run a single source search with its own timeout and report its status"""
+    start_time = time.perf_counter()
+    try:
+        results, cache_state = await asyncio.wait_for(cached_search_source(source, request, page_token), timeout=config.SOURCE_TIMEOUT)
+        source_status = {"status": "ok", "count": len(results), "cache": cache_state}
+    except asyncio.TimeoutError:
+        logger.warning(f"{source} search timed out after {config.SOURCE_TIMEOUT}s")
+        results = ResultPage()
+        source_status = {"status": "timeout", "count": 0}
+    except Exception as e:
+        logger.error(f"{source} search error: {e}")
+        results = ResultPage()
+        source_status = {"status": "error", "count": 0, "error": str(e)}
+    
+    source_status["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+    return results, source_status
+
+async def iter_source_searches(request: SearchRequest, page_tokens: Optional[Dict[str, Any]] = None):
+    """
+    Query all requested sources concurrently and yield (source, results, status)
+    for each one as soon as it finishes, within the overall search deadline.
+    With page_tokens, only those sources are queried, each resuming from its token.
+    """
+    sources = list(dict.fromkeys(request.sources)) if page_tokens is None else list(page_tokens)
+    page_tokens = page_tokens or {}
+    unsupported = [source for source in sources if source not in SEARCH_SOURCES]
+    tasks = {
+        asyncio.create_task(_timed_source_search(source, request, page_tokens.get(source))): source
+        for source in sources
+        if source in SEARCH_SOURCES
+    }
+    pending = set(tasks)
+    deadline = time.monotonic() + config.SEARCH_DEADLINE
     
-    # Sort by relevance and date
-    all_results.sort(key=lambda x: x.published_at, reverse=True)
+    try:
+        for source in unsupported:
+            yield source, ResultPage(), {"status": "unsupported", "count": 0}
+        
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(deadline - time.monotonic(), 0),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                results, source_status = task.result()
+                yield tasks[task], results, source_status
+        
+        for task in pending:
+            source = tasks[task]
+            logger.warning(f"{source} search cancelled, search deadline of {config.SEARCH_DEADLINE}s exceeded")
+            yield source, ResultPage(), {"status": "deadline_exceeded", "count": 0}
+    finally:
+        # Also reached when a streaming client goes away mid-search
+        for task in pending:
+            task.cancel()
+
+async def fan_out_search(request: SearchRequest, page_tokens: Optional[Dict[str, Any]] = None):
+    """
+    Query all requested sources concurrently within the overall search deadline.
+    Returns the results of the sources that finished in time, a status block per
+    source and each source's next page token.
+    """
+    results_by_source: Dict[str, List[SearchResult]] = {}
+    sources_status: Dict[str, Dict[str, Any]] = {}
+    next_pages: Dict[str, Any] = {}
     
-    # Limit results
-    final_results = all_results[:request.max_results]
+    async for source, results, source_status in iter_source_searches(request, page_tokens):
+        if source_status["status"] not in ("unsupported", "deadline_exceeded"):
+            results_by_source[source] = results
+        sources_status[source] = source_status
+        next_pages[source] = results.next_page
     
-    # Prepare response
-    response = {
+    # Report sources in the order they were requested, not the order they finished
+    requested = dict.fromkeys(request.sources if page_tokens is None else page_tokens)
+    sources_status = {source: sources_status[source] for source in requested}
+    return results_by_source, sources_status, next_pages
+
+def search_response(request: SearchRequest, results: List[SearchResult], sources_status: Dict[str, Dict[str, Any]], next_cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Search response for one page of ranked results"""
+    return {
         "query": request.query,
-        "total_results": len(final_results),
+        "total_results": len(results),
         "sources": request.sources,
-        "results": [result.dict() for result in final_results],
+        "results": results,
+        "next_cursor": next_cursor,
         "metadata": {
             "search_time": datetime.now().isoformat(),
-            "cache_ttl": config.CACHE_TTL
+            "cache_ttl": config.CACHE_TTL,
+            "sources_status": sources_status
         }
     }
+
+def merge_search_results(request: SearchRequest, results_by_source: Dict[str, List[SearchResult]], sources_status: Dict[str, Dict[str, Any]]):
+    """Build the first-page search response; also returns every ranked result for the following pages"""
+    all_results = [result for results in results_by_source.values() for result in results]
+    
+    # Collapse the same story reported by several sources, then order what is left
+    unique_results = collapse_duplicates(all_results, page_fingerprints(results_by_source.values()))
+    ranked_results = rank_results(unique_results, request.query, request.sort, len(unique_results))
+    
+    response = search_response(request, ranked_results[:request.max_results], sources_status)
+    response["metadata"]["duplicates_collapsed"] = len(all_results) - len(unique_results)
+    return response, ranked_results
+
+def fresh_search_results(results_by_source: Dict[str, List[SearchResult]], sources_status: Dict[str, Dict[str, Any]]) -> List[SearchResult]:
+    """Results fetched from the providers on this search rather than served from cache"""
+    return [
+        result
+        for source, results in results_by_source.items()
+        if sources_status[source].get("cache") == "miss"
+        for result in results
+    ]
+
+# Pagination
+def pagination_key(request: SearchRequest) -> str:
+    """Fingerprint of the search a page state belongs to, shared by every page size"""
+    return cache_fingerprint("pages", {
+        "query": normalize_query(request.query),
+        "sources": sorted(set(request.sources)),
+        "category": request.category,
+        "date_range": request.date_range,
+        "popularity_threshold": request.popularity_threshold,
+        "sort": request.sort
+    })
+
+def page_state_key(request: SearchRequest) -> str:
+    """Cache key for a new page state; the nonce keeps each first page's state apart from other clients'"""
+    return f"{pagination_key(request)}:{uuid.uuid4().hex}"
+
+def encode_cursor(state_key: str, offset: int) -> str:
+    """Opaque cursor pointing at a position in a search's merged results"""
+    payload = json.dumps({"k": state_key, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor; raises 400 on a malformed cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        state_key, offset = str(payload["k"]), int(payload["o"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return state_key, offset
+
+async def save_page_state(state_key: str, request: SearchRequest, results: List[SearchResult], next_pages: Dict[str, Any]):
+    """Cache a search's merged results and the page token each source resumes from"""
+    await set_cached_result(state_key, {
+        "search": pagination_key(request),
+        "results": list(results),
+        "next_pages": {source: token for source, token in next_pages.items() if token is not None}
+    })
+
+async def first_page_cursor(request: SearchRequest, ranked_results: List[SearchResult], next_pages: Dict[str, Any]) -> Optional[str]:
+    """Save the merged state of a first page and return the cursor to the second, if there is one"""
+    if len(ranked_results) <= request.max_results and not any(token is not None for token in next_pages.values()):
+        return None
+    
+    state_key = page_state_key(request)
+    await save_page_state(state_key, request, ranked_results, next_pages)
+    return encode_cursor(state_key, request.max_results)
+
+async def search_next_page(request: SearchRequest):
+    """
+    Serve the page a cursor points at from the cached merged results, fetching the
+    sources' next provider pages only when the cached results run out.
+    Returns the response and the freshly fetched results.
+    """
+    state_key, offset = decode_cursor(request.cursor)
+    if not state_key.startswith("pages:"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    
+    state = await get_cached_result(state_key)
+    if state is None:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Cursor expired, run the search again")
+    if state.get("search") != pagination_key(request):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not belong to this search")
+    
+    results = search_results_adapter.validate_python(state["results"])
+    next_pages = state["next_pages"]
+    sources_status: Dict[str, Dict[str, Any]] = {}
+    fresh_results: List[SearchResult] = []
+    
+    if offset + request.max_results > len(results) and next_pages:
+        results_by_source, sources_status, next_pages = await fan_out_search(request, page_tokens=next_pages)
+        fresh_results = fresh_search_results(results_by_source, sources_status)
+        
+        # Later provider pages can repeat stories already served on earlier pages
+        seen = {key for result in results for key in dedup_keys(result)}
+        new_results = collapse_duplicates([
+            result
+            for source_results in results_by_source.values()
+            for result in source_results
+            if seen.isdisjoint(dedup_keys(result))
+        ], page_fingerprints(results_by_source.values()))
+        results += rank_results(new_results, request.query, request.sort, len(new_results))
+        await save_page_state(state_key, request, results, next_pages)
+        next_pages = {source: token for source, token in next_pages.items() if token is not None}
+    
+    page = results[offset:offset + request.max_results]
+    end = offset + len(page)
+    next_cursor = encode_cursor(state_key, end) if end < len(results) or next_pages else None
+    return search_response(request, page, sources_status, next_cursor), fresh_results
+
+async def run_search(request: SearchRequest):
+    """Run a search across all requested sources; returns the response and the freshly fetched results"""
+    # Query all sources concurrently, each through its own results cache
+    results_by_source, sources_status, next_pages = await fan_out_search(request)
+    response, ranked_results = merge_search_results(request, results_by_source, sources_status)
+    response["next_cursor"] = await first_page_cursor(request, ranked_results, next_pages)
+    return response, fresh_search_results(results_by_source, sources_status)
+
+def format_stream_event(event: str, payload: Dict[str, Any], stream_format: str) -> str:
+    """Encode one streaming search event as an NDJSON line or a Server-Sent Event"""
+    data = to_json({"event": event, **payload}).decode()
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return data + "\n"
+
+async def stream_search(request: SearchRequest, stream_format: str):
+    """Emit each source's results as it arrives, then the merged and ranked response"""
+    results_by_source: Dict[str, List[SearchResult]] = {}
+    sources_status: Dict[str, Dict[str, Any]] = {}
+    next_pages: Dict[str, Any] = {}
+    
+    async for source, results, source_status in iter_source_searches(request):
+        results_by_source[source] = results
+        sources_status[source] = source_status
+        next_pages[source] = results.next_page
+        yield format_stream_event("source", {
+            "source": source,
+            "status": source_status,
+            "results": results
+        }, stream_format)
+    
+    sources_status = {source: sources_status[source] for source in dict.fromkeys(request.sources)}
+    response, ranked_results = merge_search_results(request, results_by_source, sources_status)
+    response["next_cursor"] = await first_page_cursor(request, ranked_results, next_pages)
+    yield format_stream_event("summary", response, stream_format)
+    
+    fresh_results = fresh_search_results(results_by_source, sources_status)
+    if fresh_results:
+        await save_search_results(request.query, fresh_results)
+
+async def _wait_for_flight_result(result_key: str, lock_key: str, timeout: float) -> Optional[Dict]:
+    """Poll for the result published by the worker holding the search lock"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = await redis_cache.get(result_key)
+        if result is not None:
+            return result
+        if not await redis_cache.exists(lock_key):
+            # Leader finished without publishing (or died): check once more, then give up
+            return await redis_cache.get(result_key)
+        await asyncio.sleep(config.SINGLEFLIGHT_POLL_INTERVAL)
+    return None
+
+async def _distributed_search(fingerprint: str, request: SearchRequest):
+    """Run a search, letting only one worker at a time call the providers for a fingerprint"""
+    if not config.SINGLEFLIGHT_DISTRIBUTED:
+        return await run_search(request)
+    
+    lock_key = f"lock:{fingerprint}"
+    result_key = f"flight:{fingerprint}"
+    token = uuid.uuid4().hex
+    lock_ttl = config.SEARCH_DEADLINE + 2
+    
+    acquired = await redis_cache.acquire_lock(lock_key, token, ttl=lock_ttl)
+    if acquired is False:
+        response = await _wait_for_flight_result(result_key, lock_key, timeout=lock_ttl)
+        if response is not None:
+            return response, []
+    
+    try:
+        response, fresh_results = await run_search(request)
+        if acquired:
+            await redis_cache.set(result_key, response, ttl=config.SINGLEFLIGHT_RESULT_TTL)
+        return response, fresh_results
+    finally:
+        if acquired:
+            await redis_cache.release_lock(lock_key, token)
+
+async def coalesced_search(request: SearchRequest):
+    """Run a search, sharing one upstream call between concurrent identical requests"""
+    fingerprint = search_fingerprint(request)
+    return await search_flight.do(fingerprint, lambda: _distributed_search(fingerprint, request))
+
+async def load_taxonomy() -> List[Dict]:
+    """Load the category tree with per-category result counts"""
+    rows = await db.fetchall("""
+        SELECT c.id, c.name, c.parent_id, c.description, COALESCE(cc.count, 0) as count
+        FROM categories c
+        LEFT JOIN category_counts cc ON cc.category_id = c.id
+        ORDER BY c.name
+    """)
+    
+    categories = []
+    category_map = {}
+    
+    for row in rows:
+        category = TaxonomyItem(
+            id=row[0],
+            name=row[1],
+            parent_id=row[2],
+            count=row[4] or 0
+        )
+        categories.append(category)
+        category_map[category.id] = category
+    
+    # Build hierarchical structure
+    root_categories = []
+    for category in categories:
+        if category.parent_id is None:
+            root_categories.append(category)
+        else:
+            parent = category_map.get(category.parent_id)
+            if parent:
+                parent.subcategories.append(category)
+    
+    return [cat.dict() for cat in root_categories]
+
+async def get_cached_result(cache_key: str):
+    """Get result from cache, reading through to Redis on a local miss"""
+    result = memory_cache.get(cache_key)
+    if result is None:
+        result = await redis_cache.get(cache_key)
+        if result is not None:
+            memory_cache[cache_key] = result
+    return result
+
+async def set_cached_result(cache_key: str, result: Any):
+    """Set result in the local cache and write it through to Redis"""
+    memory_cache[cache_key] = result
+    await redis_cache.set(cache_key, result, ttl=config.CACHE_TTL)
+
+async def get_shared_result(cache_key: str):
+    """
+    Get state that any worker may update from Redis alone, since a worker's local
+    copy can be behind; the local cache only stands in while Redis is unavailable
+    """
+    if redis_cache.available:
+        result = await redis_cache.get(cache_key)
+        if redis_cache.available:
+            return result
+    return memory_cache.get(cache_key)
+
+async def set_shared_result(cache_key: str, result: Any):
+    """Counterpart of get_shared_result: write to Redis, or locally while it is unavailable"""
+    if redis_cache.available:
+        await redis_cache.set(cache_key, result, ttl=config.CACHE_TTL)
+        if redis_cache.available:
+            return
+    memory_cache[cache_key] = result
+
+_background_refreshes: Dict[str, asyncio.Task] = {}
+
+async def _store_cache_entry(cache_key: str, value: Any, soft_ttl: int):
+    await set_cached_result(cache_key, {"value": value, "fresh_until": time.time() + soft_ttl})
+
+async def _refresh_cache_entry(cache_key: str, loader: Callable[[], Awaitable[Any]], soft_ttl: int, cacheable: Optional[Callable[[Any], bool]] = None):
+    try:
+        value = await loader()
+        if cacheable is None or cacheable(value):
+            await _store_cache_entry(cache_key, value, soft_ttl)
+    except Exception as e:
+        logger.error(f"Background refresh of {cache_key} failed: {e}")
+    finally:
+        _background_refreshes.pop(cache_key, None)
+
+async def get_cached_or_load(
+    cache_key: str,
+    loader: Callable[[], Awaitable[Any]],
+    soft_ttl: Optional[int] = None,
+    cacheable: Optional[Callable[[Any], bool]] = None
+):
+    """
+    Stale-while-revalidate cache lookup. Entries older than the soft TTL but
+    younger than the hard TTL (CACHE_TTL) are served immediately while a single
+    background refresh runs. Returns the value and "fresh", "stale" or "miss".
+    Loaded values rejected by cacheable are returned without being stored.
+    """
+    soft_ttl = config.CACHE_SOFT_TTL if soft_ttl is None else soft_ttl
+    entry = await get_cached_result(cache_key)
+    
+    if entry is not None:
+        if time.time() < entry["fresh_until"]:
+            return entry["value"], "fresh"
+        refresh = _background_refreshes.get(cache_key)
+        if refresh is None or refresh.done() or refresh.get_loop() is not asyncio.get_running_loop():
+            _background_refreshes[cache_key] = asyncio.create_task(
+                _refresh_cache_entry(cache_key, loader, soft_ttl, cacheable)
+            )
+        return entry["value"], "stale"
+    
+    async def load_and_store():
+        value = await loader()
+        if cacheable is None or cacheable(value):
+            await _store_cache_entry(cache_key, value, soft_ttl)
+        return value
+    
+    value, _ = await cache_flight.do(cache_key, load_and_store)
+    return value, "miss"
+
+# API Endpoints
+
+@app.post("/api/search", response_model=Dict[str, Any])
+async def search_content(request: SearchRequest, background_tasks: BackgroundTasks):
+    """
+    Search for IT content across multiple sources
+    """
+    if request.cursor:
+        (response, fresh_results), shared = await search_next_page(request), False
+    else:
+        (response, fresh_results), shared = await coalesced_search(request)
+    
+    # Save freshly fetched results in background, once per shared upstream call
+    if fresh_results and not shared:
+        background_tasks.add_task(save_search_results, request.query, fresh_results)
     
-    # Cache result
-    set_cached_result(cache_key, response)
+    # Serialize the models directly rather than through response_model validation
+    return Response(
+        content=to_json({**response, "query": request.query, "sources": request.sources}),
+        media_type="application/json"
+    )
+
+@app.post("/api/search/stream")
+async def search_content_stream(
+    request: SearchRequest,
+    http_request: Request,
+    stream_format: Optional[str] = Query(default=None, alias="format", pattern="^(ndjson|sse)$")
+):
+    """
+    Stream search results: one "source" event per source as soon as it answers,
+    then a "summary" event with the merged, ranked response.
+    NDJSON by default; Server-Sent Events with ?format=sse or Accept: text/event-stream.
+    """
+    if request.cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The stream serves first pages only; fetch later pages from /api/search"
+        )
     
-    # Save results in background
-    background_tasks.add_task(save_search_results, request.query, final_results)
+    if stream_format is None:
+        accept = http_request.headers.get("accept", "")
+        stream_format = "sse" if "text/event-stream" in accept else "ndjson"
     
-    return response
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_search(request, stream_format),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.post("/api/suggest-article", response_model=SEOSuggestion)
 async def suggest_article_content(request: SEOSuggestionRequest):
     """
     Generate SEO-optimized article suggestions based on content
     """
-    # Generate cache key based on content hash
-    content_hash = hashlib.md5(request.content.encode()).hexdigest()
-    cache_key = f"seo_suggestions:{content_hash}"
+    # Cache key covering every input that changes the output
+    cache_key = seo_fingerprint(request)
     
     # Check cache first
     cached_result = await get_cached_result(cache_key)
@@ -950,25 +3076,22 @@ async def suggest_article_content(request: SEOSuggestionRequest):
         )
         
         # Cache result
-        set_cached_result(cache_key, suggestions.dict())
+        await set_cached_result(cache_key, suggestions.dict())
         
         # Save to database
         try:
-            conn = sqlite3.connect("zerocrash.db")
-            conn.execute("""
+            await db.execute("""
                 INSERT OR REPLACE INTO seo_suggestions 
                 (id, content_hash, suggestions_data, language, content_type, created_at)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (
-                f"seo_{content_hash}",
-                content_hash,
-                str(suggestions.dict()),
+                cache_key,
+                content_digest(request.content),
+                json.dumps(suggestions.dict(), separators=(",", ":"), ensure_ascii=False),
                 request.language,
                 request.content_type,
                 datetime.now()
             ))
-            conn.commit()
-            conn.close()
         except Exception as e:
             logger.error(f"Error saving SEO suggestions: {e}")
         
@@ -981,56 +3104,52 @@ async def suggest_article_content(request: SEOSuggestionRequest):
             detail="Error generating SEO suggestions"
         )
 
+@app.post("/api/suggest-article/draft", response_model=SEODraftSuggestion)
+async def suggest_draft_content(request: SEODraftRequest):
+    """
+    Incremental SEO suggestions for a draft being edited: send every paragraph
+    the first time, then only the changed ones with the new paragraph count and
+    the revision returned by the previous update
+    """
+    edits = {edit.index: edit.text for edit in request.paragraphs}
+    if any(index >= request.paragraph_count for index in edits):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Paragraph index beyond paragraph_count"
+        )
+    
+    try:
+        suggestions, analyzed, revision = await seo_service.update_draft(
+            request.document_id,
+            request.paragraph_count,
+            edits,
+            target_keywords=request.target_keywords,
+            revision=request.revision
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{e}; resubmit the full draft")
+    except Exception as e:
+        logger.error(f"SEO draft analysis error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error generating SEO suggestions"
+        )
+    
+    return SEODraftSuggestion(
+        **suggestions.dict(),
+        document_id=request.document_id,
+        revision=revision,
+        paragraphs_analyzed=analyzed,
+        paragraphs_reused=request.paragraph_count - analyzed
+    )
+
 @app.get("/api/taxonomy", response_model=List[TaxonomyItem])
 async def get_it_taxonomy():
     """
     Get IT categories taxonomy with hierarchical structure
     """
-    cache_key = "taxonomy"
-    
-    # Check cache first
-    cached_result = await get_cached_result(cache_key)
-    if cached_result:
-        return cached_result
-    
     try:
-        conn = sqlite3.connect("zerocrash.db")
-        cursor = conn.execute("""
-            SELECT id, name, parent_id, description, 
-                   (SELECT COUNT(*) FROM search_results WHERE category = c.name OR tags LIKE '%' || c.name || '%') as count
-            FROM categories c
-            ORDER BY name
-        """)
-        
-        categories = []
-        category_map = {}
-        
-        for row in cursor.fetchall():
-            category = TaxonomyItem(
-                id=row[0],
-                name=row[1],
-                parent_id=row[2],
-                count=row[4] or 0
-            )
-            categories.append(category)
-            category_map[category.id] = category
-        
-        # Build hierarchical structure
-        root_categories = []
-        for category in categories:
-            if category.parent_id is None:
-                root_categories.append(category)
-            else:
-                parent = category_map.get(category.parent_id)
-                if parent:
-                    parent.subcategories.append(category)
-        
-        conn.close()
-        
-        # Cache result
-        result = [cat.dict() for cat in root_categories]
-        set_cached_result(cache_key, result)
-        
+        result, _ = await get_cached_or_load("taxonomy", load_taxonomy)
         return result
         
     except Exception as e:
@@ -1055,14 +3174,14 @@ async def test_api_connections():
             error = None
         else:
             # Make a simple test request
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{google_news_client.base_url}/search",
-                    params={"q": "test", "token": config.GNEWS_API_KEY, "max": 1},
-                    timeout=5.0
-                )
-                status_result = "success" if response.status_code == 200 else "error"
-                error = f"HTTP {response.status_code}" if response.status_code != 200 else None
+            client = get_http_client()
+            response = await client.get(
+                f"{google_news_client.base_url}/search",
+                params={"q": "test", "token": config.GNEWS_API_KEY, "max": 1},
+                timeout=5.0
+            )
+            status_result = "success" if response.status_code == 200 else "error"
+            error = f"HTTP {response.status_code}" if response.status_code != 200 else None
     except Exception as e:
         status_result = "error"
         error = str(e)
@@ -1082,14 +3201,14 @@ async def test_api_connections():
             status_result = "success"
             error = None
         else:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{youtube_client.base_url}/search",
-                    params={"part": "snippet", "q": "test", "key": config.YOUTUBE_API_KEY, "maxResults": 1},
-                    timeout=5.0
-                )
-                status_result = "success" if response.status_code == 200 else "error"
-                error = f"HTTP {response.status_code}" if response.status_code != 200 else None
+            client = get_http_client()
+            response = await client.get(
+                f"{youtube_client.base_url}/search",
+                params={"part": "snippet", "q": "test", "key": config.YOUTUBE_API_KEY, "maxResults": 1},
+                timeout=5.0
+            )
+            status_result = "success" if response.status_code == 200 else "error"
+            error = f"HTTP {response.status_code}" if response.status_code != 200 else None
     except Exception as e:
         status_result = "error"
         error = str(e)
@@ -1112,16 +3231,16 @@ async def test_api_connections():
             # Test Reddit authentication
             url = "https://www.reddit.com/api/v1/access_token"
             auth = httpx.BasicAuth(config.REDDIT_CLIENT_ID, config.REDDIT_CLIENT_SECRET)
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    data={"grant_type": "client_credentials"},
-                    auth=auth,
-                    headers={"User-Agent": "ZeroCrash/1.0"},
-                    timeout=5.0
-                )
-                status_result = "success" if response.status_code == 200 else "error"
-                error = f"HTTP {response.status_code}" if response.status_code != 200 else None
+            client = get_http_client()
+            response = await client.post(
+                url,
+                data={"grant_type": "client_credentials"},
+                auth=auth,
+                headers={"User-Agent": "ZeroCrash/1.0"},
+                timeout=5.0
+            )
+            status_result = "success" if response.status_code == 200 else "error"
+            error = f"HTTP {response.status_code}" if response.status_code != 200 else None
     except Exception as e:
         status_result = "error"
         error = str(e)
@@ -1144,10 +3263,7 @@ async def health_check():
     # Check database
     db_status = "healthy"
     try:
-        conn = sqlite3.connect("zerocrash.db")
-        cursor = conn.execute("SELECT 1")
-        cursor.fetchone()
-        conn.close()
+        await db.fetchall("SELECT 1")
     except Exception:
         db_status = "unhealthy"
     
@@ -1159,6 +3275,10 @@ async def health_check():
     except Exception:
         cache_status = "unhealthy"
     
+    redis_status = "disabled"
+    if config.CACHE_L2_ENABLED:
+        redis_status = "healthy" if await redis_cache.ping() else "unavailable"
+    
     # Overall status
     overall_status = "healthy" if db_status == "healthy" and cache_status == "healthy" else "unhealthy"
     
@@ -1167,6 +3287,7 @@ async def health_check():
         timestamp=datetime.now(),
         services={
             "database": db_status,
+            "redis": redis_status,
             "google_news": "configured" if config.GNEWS_API_KEY != "your-gnews-api-key" else "not_configured",
             "youtube": "configured" if config.YOUTUBE_API_KEY != "your-youtube-api-key" else "not_configured",
             "reddit": "configured" if config.REDDIT_CLIENT_ID != "your-reddit-client-id" else "not_configured"
@@ -4,14 +4,30 @@ Test suite for ZeroCrash backend API
 
 import pytest
 import asyncio
+import json
+import uuid
 from datetime import datetime
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
 
-from main import app, SearchRequest, SEOSuggestionRequest
+from main import app, SearchRequest, SEOSuggestionRequest, SearchResult
 
 client = TestClient(app)
 
+def make_result(**overrides):
+    """SearchResult with test defaults; the url is derived from the id unless given"""
+    result_id = overrides.get("id", "test-result")
+    fields = {
+        "id": result_id,
+        "title": f"Result {result_id}",
+        "description": "",
+        "url": f"https://example.com/{result_id}",
+        "source": "Google News",
+        "published_at": datetime(2025, 1, 18, 10, 0),
+        "engagement": {},
+    }
+    return SearchResult(**{**fields, **overrides})
+
 class TestSearchAPI:
     """Test search functionality"""
     
@@ -59,6 +75,104 @@ class TestSearchAPI:
         response = client.post("/api/search", json=request_data)
         assert response.status_code == 422  # Should fail validation
 
+    def test_search_reports_source_status(self):
+        """Test per-source status block when a provider fails"""
+        with patch("main.google_news_client.search", AsyncMock(side_effect=RuntimeError("boom"))):
+            response = client.post("/api/search", json={
+                "query": "source status",
+                "sources": ["google_news", "youtube"],
+                "max_results": 10
+            })
+        
+        assert response.status_code == 200
+        data = response.json()
+        sources_status = data["metadata"]["sources_status"]
+        assert sources_status["google_news"]["status"] == "error"
+        assert sources_status["youtube"]["status"] == "ok"
+        assert all(result["source"] == "YouTube" for result in data["results"])
+    
+    def test_search_source_timeout(self):
+        """Test slow sources are dropped once their timeout expires"""
+        async def slow_search(*args, **kwargs):
+            await asyncio.sleep(1)
+            return []
+        
+        with patch("main.config.SOURCE_TIMEOUT", 0.05), \
+                patch("main.reddit_client.search", slow_search):
+            response = client.post("/api/search", json={
+                "query": "slow source",
+                "sources": ["reddit", "youtube"],
+                "max_results": 10
+            })
+        
+        assert response.status_code == 200
+        sources_status = response.json()["metadata"]["sources_status"]
+        assert sources_status["reddit"]["status"] == "timeout"
+        assert sources_status["youtube"]["status"] == "ok"
+
+    def test_search_fingerprint_is_canonical(self):
+        """Test equivalent requests share one cache key"""
+        from main import search_fingerprint
+        
+        a = SearchRequest(query="Machine  Learning ", sources=["youtube", "reddit"])
+        b = SearchRequest(query="machine learning", sources=["reddit", "youtube", "reddit"])
+        c = SearchRequest(query="machine learning", sources=["reddit"])
+        
+        assert search_fingerprint(a) == search_fingerprint(b)
+        assert search_fingerprint(a) != search_fingerprint(c)
+        assert search_fingerprint(a).startswith("search:")
+
+    def test_source_results_shared_across_source_combinations(self):
+        """Test per-source caching is reused when the source filter changes"""
+        import main
+        
+        with patch("main.youtube_client.search", AsyncMock(wraps=main.youtube_client.search)) as youtube_search:
+            first = client.post("/api/search", json={"query": "Per Source Cache", "sources": ["google_news", "youtube"]})
+            second = client.post("/api/search", json={"query": "per source cache", "sources": ["youtube"]})
+        
+        assert first.json()["metadata"]["sources_status"]["youtube"]["cache"] == "miss"
+        assert second.json()["metadata"]["sources_status"]["youtube"]["cache"] == "fresh"
+        assert youtube_search.await_count == 1
+        assert second.json()["total_results"] > 0
+
+    def test_search_stream_ndjson(self):
+        """Test streamed search emits sources as they finish, then a summary"""
+        import main
+        
+        async def slow_search(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return main.reddit_client._get_mock_reddit_data(kwargs["query"])
+        
+        with patch("main.reddit_client.search", slow_search):
+            response = client.post("/api/search/stream", json={
+                "query": "streamed search",
+                "sources": ["reddit", "youtube", "unknown"],
+                "max_results": 5
+            })
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert [(e["event"], e.get("source")) for e in events] == [
+            ("source", "unknown"), ("source", "youtube"), ("source", "reddit"), ("summary", None)
+        ]
+        assert events[1]["status"]["status"] == "ok" and events[1]["results"]
+        assert events[-1]["total_results"] <= 5
+        assert list(events[-1]["metadata"]["sources_status"]) == ["reddit", "youtube", "unknown"]
+    
+    def test_search_stream_sse(self):
+        """Test Server-Sent Events framing of the search stream"""
+        response = client.post(
+            "/api/search/stream",
+            json={"query": "sse search", "sources": ["youtube"]},
+            headers={"Accept": "text/event-stream"}
+        )
+        
+        assert response.headers["content-type"].startswith("text/event-stream")
+        frames = [frame for frame in response.text.split("\n\n") if frame]
+        assert [frame.splitlines()[0] for frame in frames] == ["event: source", "event: summary"]
+        assert json.loads(frames[-1].splitlines()[1][len("data: "):])["event"] == "summary"
+
 class TestSEOAPI:
     """Test SEO suggestion functionality"""
     
@@ -95,6 +209,39 @@ class TestSEOAPI:
         # Content too short
         response = client.post("/api/suggest-article", json={"content": "short"})
         assert response.status_code == 422
+    
+    def test_suggestions_cached_per_request_options(self):
+        """Test keyword variations get their own suggestions but share the content analysis"""
+        import main
+        
+        content = "Guida al cloud computing su AWS: costi, serverless e migrazione dei carichi di lavoro."
+        with patch("main.config.MOCK_MODE", False), \
+                patch.object(main.seo_service, "analyze_content", AsyncMock(wraps=main.seo_service.analyze_content)) as analyze:
+            aws = client.post("/api/suggest-article", json={"content": content, "target_keywords": ["AWS"]}).json()
+            azure = client.post("/api/suggest-article", json={"content": content, "target_keywords": ["Azure"]}).json()
+            aws_again = client.post("/api/suggest-article", json={"content": content, "target_keywords": ["AWS"]}).json()
+        
+        assert aws["meta_descriptions"] != azure["meta_descriptions"]
+        assert "Azure" in azure["meta_descriptions"][0]
+        assert aws_again == aws
+        assert analyze.await_count == 1
+    
+    def test_seo_fingerprint_covers_all_inputs(self):
+        """Test every request option changes the SEO cache key"""
+        from main import seo_fingerprint
+        
+        base = {"content": "Contenuto di prova per il fingerprint", "target_keywords": ["cloud"]}
+        variants = [
+            base,
+            {**base, "target_keywords": ["cloud", "aws"]},
+            {**base, "language": "en"},
+            {**base, "content_type": "tutorial"},
+            {**base, "content": "Un altro contenuto di prova"},
+        ]
+        keys = {seo_fingerprint(SEOSuggestionRequest(**variant)) for variant in variants}
+        
+        assert len(keys) == len(variants)
+        assert seo_fingerprint(SEOSuggestionRequest(**{**base, "target_keywords": [" cloud "]})) == seo_fingerprint(SEOSuggestionRequest(**base))
 
 class TestTaxonomyAPI:
     """Test taxonomy functionality"""
@@ -113,6 +260,32 @@ class TestTaxonomyAPI:
         
         for expected in expected_categories:
             assert any(expected in name for name in category_names)
+    
+    @pytest.mark.asyncio
+    async def test_category_counts_maintained_on_ingest(self):
+        """Test category counters follow inserts, updates and deletes of stored results"""
+        from main import db, save_search_results
+        
+        async def count(category_id):
+            rows = await db.fetchall("SELECT count FROM category_counts WHERE category_id = ?", (category_id,))
+            return rows[0][0] if rows else 0
+        
+        await db.execute("DELETE FROM search_results WHERE id = 'category-count-test'")
+        devops, blockchain = await count("devops"), await count("blockchain")
+        
+        await save_search_results("count test", [make_result(id="category-count-test", category="DevOps", tags=[])])
+        await save_search_results("count test", [make_result(id="category-count-test", category="DevOps", tags=[])])
+        assert await count("devops") == devops + 1
+        
+        await save_search_results("count test", [make_result(id="category-count-test", category="Blockchain", tags=["DevOps"])])
+        assert await count("devops") == devops + 1
+        assert await count("blockchain") == blockchain + 1
+        
+        await save_search_results("count test", [make_result(id="category-count-test", category="Blockchain", tags=[])])
+        assert await count("devops") == devops
+        
+        await db.execute("DELETE FROM search_results WHERE id = 'category-count-test'")
+        assert await count("blockchain") == blockchain
 
 class TestHealthAPI:
     """Test health and connection endpoints"""
@@ -236,6 +409,966 @@ class TestMockClients:
             assert "title" in post_data
             assert "url" in post_data
             assert "author" in post_data
+    
+    def test_normalized_mock_data(self):
+        """Test per-source normalizers produce complete, serializable results"""
+        from main import GoogleNewsClient, YouTubeClient, RedditClient, normalize_search_results, to_json
+        
+        raw = {
+            "google_news": GoogleNewsClient("mock-key")._get_mock_news_data("test"),
+            "youtube": YouTubeClient("mock-key")._get_mock_youtube_data("test"),
+            "reddit": RedditClient("mock-id", "mock-secret")._get_mock_reddit_data("test"),
+        }
+        raw["google_news"].append({**raw["google_news"][0], "url": "https://example.com/no-description", "description": None})
+        raw["youtube"].append({"id": {}, "snippet": {}})
+        
+        for source, items in raw.items():
+            results = normalize_search_results(items, source)
+            assert len(results) == (2 if source == "youtube" else len(items))
+            for result in results:
+                assert result.published_at.tzinfo is not None
+                assert isinstance(result.description, str)
+                assert json.loads(to_json(result))["id"] == result.id
+    
+    def test_malformed_items_skipped(self):
+        """Test items missing a title or url are dropped instead of failing the search"""
+        import main
+        from main import ResultPage
+        
+        article = main.google_news_client._get_mock_news_data("malformed")[0]
+        items = ResultPage([
+            article,
+            {**article, "url": "https://example.com/null-title", "title": None},
+            {**article, "url": None},
+            {**article, "url": "https://example.com/blank-title", "title": "  "},
+        ])
+        
+        with patch("main.google_news_client.search", AsyncMock(return_value=items)):
+            response = client.post("/api/search", json={"query": "malformed items", "sources": ["google_news"]})
+        
+        assert response.status_code == 200
+        assert [result["url"] for result in response.json()["results"]] == [article["url"]]
+
+class TestRedditSearchModes:
+    """Test Reddit multi-subreddit search modes"""
+    
+    @pytest.mark.asyncio
+    async def test_parallel_mode_stops_early(self):
+        """Test parallel mode stops once enough posts are collected"""
+        from main import RedditClient
+        
+        reddit = RedditClient("mock-id", "mock-secret")
+        calls = []
+        
+        async def fake_search_subreddit(query, subreddit, limit=10, after=None):
+            calls.append(subreddit)
+            await asyncio.sleep(0.01)
+            return [{"data": {"subreddit": subreddit}}] * 10
+        
+        with patch("main.config.MOCK_MODE", False), patch("main.config.REDDIT_MAX_CONCURRENCY", 1):
+            reddit.token_manager.get_token = AsyncMock(return_value="token")
+            reddit._search_subreddit = fake_search_subreddit
+            posts = await reddit.search("python", limit=15, mode="parallel")
+        
+        assert len(posts) == 15
+        assert len(calls) < len(RedditClient.DEFAULT_SUBREDDITS)
+    
+    @pytest.mark.asyncio
+    async def test_parallel_pagination_skips_no_posts(self):
+        """Test paging through parallel mode eventually serves every post of every subreddit"""
+        from main import RedditClient, ResultPage
+        
+        reddit = RedditClient("mock-id", "mock-secret")
+        
+        async def fake_search_subreddit(query, subreddit, limit=10, after=None):
+            offset = int(after or 0)
+            await asyncio.sleep(0.001 * RedditClient.DEFAULT_SUBREDDITS.index(subreddit))
+            posts = [{"data": {"id": f"{subreddit}-{i}"}} for i in range(offset, offset + 10)]
+            return ResultPage(posts, next_page=str(offset + 10) if offset + 10 < 20 else None)
+        
+        seen = set()
+        after = None
+        with patch("main.config.MOCK_MODE", False):
+            reddit.token_manager.get_token = AsyncMock(return_value="token")
+            reddit._search_subreddit = fake_search_subreddit
+            for _ in range(50):
+                page = await reddit.search("python", limit=15, mode="parallel", after=after)
+                seen.update(post["data"]["id"] for post in page)
+                after = page.next_page
+                if after is None:
+                    break
+        
+        assert len(seen) == 20 * len(RedditClient.DEFAULT_SUBREDDITS)
+    
+    @pytest.mark.asyncio
+    async def test_parallel_mode_errors(self):
+        """Test failing subreddits are skipped unless every subreddit fails"""
+        from main import RedditClient
+        
+        reddit = RedditClient("mock-id", "mock-secret")
+        reddit.token_manager.get_token = AsyncMock(return_value="token")
+        
+        async def partly_failing(query, subreddit, limit=10, after=None):
+            if subreddit != "webdev":
+                raise RuntimeError("503 Service Unavailable")
+            return [{"data": {"subreddit": subreddit}}]
+        
+        with patch("main.config.MOCK_MODE", False):
+            reddit._search_subreddit = partly_failing
+            posts = await reddit.search("python", mode="parallel")
+            assert posts == [{"data": {"subreddit": "webdev"}}]
+            assert set(posts.next_page) == set(RedditClient.DEFAULT_SUBREDDITS) - {"webdev"}
+            assert not posts.complete
+            
+            reddit._search_subreddit = AsyncMock(side_effect=RuntimeError("429 Too Many Requests"))
+            with pytest.raises(RuntimeError):
+                await reddit.search("python", mode="parallel")
+    
+    def test_reddit_outage_reported_in_status(self):
+        """Test a Reddit failure shows up as an error in the search status"""
+        import httpx
+        import main
+        
+        failing = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+        with patch("main.config.MOCK_MODE", False), \
+                patch.object(main.reddit_client, "http_client", failing), \
+                patch.object(main.reddit_client.token_manager, "get_token", AsyncMock(return_value="token")):
+            response = client.post("/api/search", json={"query": "reddit outage", "sources": ["reddit"]})
+        
+        assert response.json()["metadata"]["sources_status"]["reddit"]["status"] == "error"
+    
+    @pytest.mark.asyncio
+    async def test_combined_mode_single_request(self):
+        """Test combined mode issues a single multireddit request"""
+        from main import RedditClient
+        
+        reddit = RedditClient("mock-id", "mock-secret")
+        reddit.token_manager.get_token = AsyncMock(return_value="token")
+        reddit._search_subreddit = AsyncMock(return_value=[])
+        
+        with patch("main.config.MOCK_MODE", False):
+            await reddit.search("python", subreddits=["programming", "webdev"], mode="combined")
+        
+        reddit._search_subreddit.assert_awaited_once_with("python", "programming+webdev", limit=20, after=None)
+
+class TestRedditTokenManager:
+    """Test Reddit OAuth token caching"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_are_coalesced(self):
+        """Test concurrent callers share one token request"""
+        from main import RedditTokenManager
+        
+        async def fetch_token():
+            await asyncio.sleep(0.01)
+            return {"access_token": "token-1", "expires_in": 3600}
+        
+        fetch = AsyncMock(side_effect=fetch_token)
+        manager = RedditTokenManager(fetch)
+        tokens = await asyncio.gather(*(manager.get_token() for _ in range(5)))
+        
+        assert tokens == ["token-1"] * 5
+        assert fetch.await_count == 1
+        assert await manager.get_token() == "token-1"
+        assert fetch.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_token_refreshed_before_expiry(self):
+        """Test a token close to expiry is served while refreshing in the background"""
+        from main import RedditTokenManager
+        
+        fetch = AsyncMock(side_effect=[
+            {"access_token": "token-1", "expires_in": 30},
+            {"access_token": "token-2", "expires_in": 3600}
+        ])
+        manager = RedditTokenManager(fetch, refresh_margin=60)
+        
+        assert await manager.get_token() == "token-1"
+        assert await manager.get_token() == "token-1"
+        await asyncio.sleep(0)
+        assert await manager.get_token() == "token-2"
+        assert fetch.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_search_retries_once_on_401(self):
+        """Test a rejected token is refreshed and the request retried"""
+        import httpx
+        from main import RedditClient
+        
+        seen_tokens = []
+        issued = iter(["stale", "fresh"])
+        
+        def handler(request):
+            if request.url.path == "/api/v1/access_token":
+                return httpx.Response(200, json={"access_token": next(issued), "expires_in": 3600})
+            token = request.headers["Authorization"].split()[-1]
+            seen_tokens.append(token)
+            if token == "stale":
+                return httpx.Response(401)
+            return httpx.Response(200, json={"data": {"children": [{"data": {"title": "ok"}}]}})
+        
+        reddit = RedditClient("id", "secret", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        posts = await reddit._search_subreddit("python", "programming")
+        
+        assert seen_tokens == ["stale", "fresh"]
+        assert posts == [{"data": {"title": "ok"}}]
+
+class TestTwoTierCache:
+    """Test L1 memory / L2 Redis cache"""
+    
+    def test_cache_value_round_trip(self):
+        """Test compact serialization, with compression for large values"""
+        from main import encode_cache_value, decode_cache_value
+        
+        small = {"query": "ai", "published_at": datetime(2025, 1, 18, 10, 0)}
+        large = {"results": ["x" * 100] * 50}
+        
+        assert decode_cache_value(encode_cache_value(small)) == {"query": "ai", "published_at": "2025-01-18T10:00:00"}
+        assert encode_cache_value(large).startswith(b"z")
+        assert decode_cache_value(encode_cache_value(large)) == large
+    
+    @pytest.mark.asyncio
+    async def test_unreachable_redis_degrades_to_l1(self):
+        """Test Redis errors disable L2 for a while instead of failing requests"""
+        from main import RedisCache
+        
+        cache = RedisCache("redis://127.0.0.1:1")
+        assert await cache.get("key") is None
+        assert not cache.available
+        await cache.set("key", {"value": 1}, ttl=60)
+        await cache.close()
+    
+    @pytest.mark.asyncio
+    async def test_dropped_client_is_closed(self):
+        """Test the client discarded after a Redis failure has its connection pool closed"""
+        from main import RedisCache
+        
+        cache = RedisCache("redis://127.0.0.1:1")
+        failing = AsyncMock()
+        failing.get.side_effect = ConnectionError("refused")
+        cache._client = failing
+        
+        with patch("main.config.CACHE_L2_ENABLED", True):
+            assert await cache.get("key") is None
+        await cache.close()
+        
+        assert cache._client is None
+        failing.aclose.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_read_through_populates_l1(self):
+        """Test an L2 hit is copied into the in-process cache"""
+        import main
+        
+        l2 = AsyncMock()
+        l2.get.return_value = {"value": 1}
+        with patch("main.redis_cache", l2):
+            assert await main.get_cached_result("l2-only-key") == {"value": 1}
+            l2.get.reset_mock()
+            assert await main.get_cached_result("l2-only-key") == {"value": 1}
+            l2.get.assert_not_called()
+            
+            await main.set_cached_result("written-key", {"value": 2})
+            l2.set.assert_awaited_once_with("written-key", {"value": 2}, ttl=main.config.CACHE_TTL)
+
+class TestStaleWhileRevalidate:
+    """Test soft/hard TTL cache entries"""
+    
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_refreshing(self):
+        """Test stale values are returned immediately and refreshed once in the background"""
+        import main
+        
+        loader = AsyncMock(side_effect=["v1", "v2", "v3"])
+        
+        assert await main.get_cached_or_load("swr-test", loader, soft_ttl=0) == ("v1", "miss")
+        
+        # Past the soft TTL: serve v1, refresh in the background only once
+        assert await main.get_cached_or_load("swr-test", loader, soft_ttl=60) == ("v1", "stale")
+        assert await main.get_cached_or_load("swr-test", loader, soft_ttl=60) == ("v1", "stale")
+        await main._background_refreshes["swr-test"]
+        
+        assert await main.get_cached_or_load("swr-test", loader, soft_ttl=60) == ("v2", "fresh")
+        assert loader.await_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_incomplete_pages_not_cached(self):
+        """Test a page missing part of its source is returned but fetched again next time"""
+        import main
+        from main import ResultPage, SearchRequest
+        
+        request = SearchRequest(query="partial page test", sources=["reddit"])
+        pages = [ResultPage([], next_page={"python": None}, complete=False), ResultPage([], next_page=None)]
+        with patch("main.search_source", AsyncMock(side_effect=pages)) as fetch:
+            first, state = await main.cached_search_source("reddit", request)
+            assert (list(first), first.next_page, state) == ([], {"python": None}, "miss")
+            
+            second, state = await main.cached_search_source("reddit", request)
+            assert (second.next_page, state) == (None, "miss")
+            
+            _, state = await main.cached_search_source("reddit", request)
+            assert state == "fresh"
+            assert fetch.await_count == 2
+
+class TestRequestCoalescing:
+    """Test single-flight deduplication of identical searches"""
+    
+    @pytest.mark.asyncio
+    async def test_identical_searches_share_one_call(self):
+        """Test concurrent identical searches await one upstream call"""
+        import main
+        
+        async def slow_search(request):
+            await asyncio.sleep(0.05)
+            return {"query": request.query, "results": []}, []
+        
+        run_search = AsyncMock(side_effect=slow_search)
+        requests = [SearchRequest(query=query) for query in ["Kubernetes"] * 5 + ["kubernetes  "] * 5]
+        
+        with patch("main.run_search", run_search):
+            outcomes = await asyncio.gather(*(main.coalesced_search(request) for request in requests))
+        
+        assert run_search.await_count == 1
+        assert [shared for _, shared in outcomes].count(False) == 1
+    
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self):
+        """Test a failed shared call raises for every waiter and is not remembered"""
+        from main import SingleFlight
+        
+        flight = SingleFlight()
+        
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+        
+        outcomes = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+        assert await flight.do("key", AsyncMock(return_value="ok")) == ("ok", False)
+
+class TestDatabase:
+    """Test async database layer"""
+    
+    @pytest.mark.asyncio
+    async def test_queries_run_off_the_event_loop(self):
+        """Test database work runs on the database thread pool"""
+        import threading
+        from main import db
+        
+        thread_name = await db.run(lambda conn: threading.current_thread().name)
+        assert thread_name.startswith("zerocrash-db")
+        assert await db.fetchall("SELECT 1") == [(1,)]
+    
+    @pytest.mark.asyncio
+    async def test_save_search_results(self):
+        """Test search results are persisted through the pool"""
+        from main import db, save_search_results
+        
+        result = make_result(id="db-test-result", title="Database test", description="Stored through the async layer")
+        await save_search_results("db test", [result])
+        
+        rows = await db.fetchall("SELECT title FROM search_results WHERE id = ?", ("db-test-result",))
+        assert rows == [("Database test",)]
+    
+    @pytest.mark.asyncio
+    async def test_connection_profile(self, tmp_path):
+        """Test every connection gets WAL and the tuned pragmas, and maintenance runs"""
+        from main import Database
+        
+        database = Database(pool_size=2)
+        with patch("main.config.DATABASE_URL", f"sqlite:///{tmp_path / 'profile.db'}"):
+            pragmas = await database.run(lambda conn: [
+                conn.execute(f"PRAGMA {name}").fetchone()[0]
+                for name in ("journal_mode", "synchronous", "temp_store", "busy_timeout")
+            ])
+            await database.maintain()
+        database.close()
+        
+        assert pragmas == ["wal", 1, 2, 5000]
+    
+    def test_json_payloads_and_generated_columns(self, tmp_path):
+        """Test legacy repr payloads are migrated to JSON and hot fields are queryable"""
+        import sqlite3
+        from main import create_schema
+        
+        conn = sqlite3.connect(str(tmp_path / "legacy.db"))
+        conn.executescript("""
+            CREATE TABLE search_results (
+                id TEXT PRIMARY KEY, query TEXT NOT NULL, title TEXT NOT NULL, description TEXT,
+                url TEXT NOT NULL, source TEXT NOT NULL, author TEXT, published_at TIMESTAMP,
+                engagement_data TEXT, category TEXT, tags TEXT, seo_score REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO search_results (id, query, title, url, source, engagement_data)
+            VALUES ('a', 'q', 'A', 'https://a', 'YouTube', "{'views': 45200, 'likes': 1240}"),
+                   ('b', 'q', 'B', 'https://b', 'Reddit', '{"score": 127, "comments": 43}');
+        """)
+        create_schema(conn)
+        
+        assert conn.execute("SELECT engagement_data FROM search_results WHERE id = 'a'").fetchone() == ('{"views":45200,"likes":1240}',)
+        assert conn.execute("SELECT id FROM search_results ORDER BY engagement_views DESC LIMIT 1").fetchone() == ("a",)
+        assert conn.execute("SELECT engagement_score FROM search_results WHERE id = 'b'").fetchone() == (127,)
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM search_results WHERE engagement_views > 1000").fetchall()
+        assert "idx_search_results_engagement_views" in str(plan)
+        conn.close()
+
+class TestSearchResultWriter:
+    """Test write-behind persistence of search results"""
+    
+    @pytest.mark.asyncio
+    async def test_rows_batched_and_drained_on_stop(self):
+        """Test rows from many requests are flushed together and drained on shutdown"""
+        import main
+        from main import SearchResultWriter, db
+        
+        writer = SearchResultWriter(batch_size=100, flush_interval=5.0, max_pending=1000)
+        results = [make_result(id=f"writer-test-{i}", source="Reddit") for i in range(30)]
+        
+        with patch("main.search_writer", writer), \
+                patch("main.insert_search_result_rows", wraps=main.insert_search_result_rows) as insert_rows:
+            writer.start()
+            for i in range(0, 30, 10):
+                await main.save_search_results("writer test", results[i:i + 10])
+            await writer.stop()
+        
+        assert insert_rows.call_count == 1
+        rows = await db.fetchall("SELECT COUNT(*) FROM search_results WHERE id LIKE 'writer-test-%'")
+        assert rows == [(30,)]
+
+class TestLocalSearch:
+    """Test local full-text search over stored results"""
+    
+    @pytest.mark.asyncio
+    async def test_local_index_ranking_and_date_filter(self):
+        """Test stored results are found by BM25 with title matches first and old rows filtered"""
+        from datetime import timedelta, timezone
+        from main import save_search_results, search_local_index
+        
+        now = datetime.now(timezone.utc)
+        
+        await save_search_results("quantistico", [
+            make_result(id="fts-body", title="Novità hardware", description="Il calcolo quantistico arriva in Italia",
+                        published_at=now - timedelta(days=1), engagement={"views": 10}),
+            make_result(id="fts-title", title="Calcolo quantistico spiegato", description="Una guida",
+                        published_at=now - timedelta(days=2), engagement={"views": 10}),
+            make_result(id="fts-old", title="Calcolo quantistico nel 2010", description="Archivio",
+                        published_at=now - timedelta(days=400), engagement={"views": 10}),
+        ])
+        
+        results = await search_local_index(SearchRequest(query="Calcolo Quantistico", sources=["local"]))
+        assert [result.id for result in results] == ["fts-title", "fts-body"]
+        assert results[0].engagement == {"views": 10}
+    
+    def test_local_source_in_search_endpoint(self):
+        """Test local results merge with live provider results"""
+        response = client.post("/api/search", json={
+            "query": "calcolo quantistico",
+            "sources": ["local", "youtube"]
+        })
+        
+        assert response.status_code == 200
+        sources_status = response.json()["metadata"]["sources_status"]
+        assert sources_status["local"]["status"] == "ok"
+        assert sources_status["local"]["cache"] == "bypass"
+        assert sources_status["youtube"]["status"] == "ok"
+
+class TestRanking:
+    """Test top-K ranking of merged results"""
+    
+    def test_sort_modes(self):
+        """Test relevance, date and engagement orderings"""
+        from datetime import timedelta, timezone
+        from main import rank_results
+        
+        now = datetime.now(timezone.utc)
+        results = [
+            make_result(id="newest", title="Frontend news", published_at=now, engagement={"views": 0}),
+            make_result(id="match", title="Kubernetes in produzione", published_at=now - timedelta(hours=1), engagement={"views": 0}),
+            make_result(id="popular", title="Cloud weekly", source="YouTube", published_at=now - timedelta(days=30), engagement={"views": 90000}),
+            make_result(id="quiet", title="Kubernetes", source="YouTube", published_at=now - timedelta(days=30), engagement={"views": 10}),
+        ]
+        
+        assert rank_results(results, "kubernetes", "relevance", 1)[0].id == "match"
+        assert [r.id for r in rank_results(results, "kubernetes", "date", 2)] == ["newest", "match"]
+        assert rank_results(results, "kubernetes", "engagement", 1)[0].id == "popular"
+        assert len(rank_results(results, "kubernetes", "relevance", 10)) == 4
+    
+    def test_engagement_normalized_per_source(self):
+        """Test each source's most engaging result scores 1.0"""
+        from main import normalized_engagement
+        
+        youtube = make_result(id="yt", title="Video", source="YouTube", engagement={"views": 1000000})
+        reddit = make_result(id="rd", title="Post", source="Reddit", engagement={"score": 50, "comments": 3})
+        news = make_result(id="gn", title="News", engagement={"views": 0, "shares": 0})
+        
+        scores = normalized_engagement([youtube, reddit, news])
+        assert scores[id(youtube)] == scores[id(reddit)] == 1.0
+        assert scores[id(news)] == 0.0
+    
+    def test_invalid_sort_rejected(self):
+        """Test unknown sort options fail validation"""
+        response = client.post("/api/search", json={"query": "python", "sort": "random"})
+        assert response.status_code == 422
+
+class TestDeduplication:
+    """Test cross-source duplicate collapsing"""
+    
+    def test_canonical_url(self):
+        """Test tracking parameters, www. and fragments are ignored"""
+        from main import canonical_url
+        
+        assert canonical_url("https://www.Example.com/news/ai/?utm_source=x&b=2&a=1#top") == "example.com/news/ai?a=1&b=2"
+        assert canonical_url("http://example.com/news/ai?fbclid=abc") == "example.com/news/ai"
+        assert canonical_url("https://youtu.be/abc123") == canonical_url("https://www.youtube.com/watch?v=abc123")
+    
+    def test_same_url_collapsed(self):
+        """Test results linking the same page keep the most engaging one"""
+        from main import collapse_duplicates
+        
+        results = [
+            make_result(id="a", title="Rilascio Python 3.13", url="https://example.com/py?utm_medium=rss", engagement={"views": 10}),
+            make_result(id="b", title="Python 3.13 è uscito", url="https://www.example.com/py/", source="Reddit", engagement={"score": 500}),
+            make_result(id="c", title="Kubernetes tutorial", url="https://example.com/k8s", source="YouTube", engagement={"views": 5}),
+        ]
+        
+        collapsed = collapse_duplicates(results)
+        assert sorted(r.id for r in collapsed) == ["b", "c"]
+        representative = next(r for r in collapsed if r.id == "b")
+        assert representative.duplicates == [{"id": "a", "url": results[0].url, "source": "Google News"}]
+    
+    def test_host_only_urls_not_merged(self):
+        """Test results whose URL names no page are only merged by id"""
+        from main import collapse_duplicates
+        
+        results = [
+            make_result(id="a", title="Primo post", url="https://reddit.com", source="Reddit", engagement={"score": 1}),
+            make_result(id="b", title="Secondo post", url="https://www.reddit.com/", source="Reddit", engagement={"score": 2}),
+            make_result(id="c", title="Terzo post", url="", source="Reddit", engagement={"score": 3}),
+        ]
+        
+        assert len(collapse_duplicates(results)) == 3
+    
+    def test_mock_reddit_posts_all_returned(self):
+        """Test distinct Reddit posts survive deduplication in a search"""
+        response = client.post("/api/search", json={"query": "reddit dedup", "sources": ["reddit"]})
+        
+        results = response.json()["results"]
+        assert len(results) == 2
+        assert all("/comments/" in result["url"] for result in results)
+    
+    def test_near_duplicate_text_collapsed(self):
+        """Test syndicated copies with slightly different text are collapsed"""
+        from main import collapse_duplicates
+        
+        text = "Il nuovo framework open source per il machine learning distribuito promette tempi di addestramento dimezzati sui cluster GPU"
+        results = [
+            make_result(id="a", title="Nuovo framework ML", description=text, url="https://site-a.it/ml", engagement={"views": 0}),
+            make_result(id="b", title="Nuovo framework ML", description=text + " aziendali", url="https://site-b.it/ml", engagement={"views": 0}),
+            make_result(id="c", title="Guida a Rust", description="Come scrivere il primo programma in Rust passo dopo passo", url="https://site-c.it/rust", engagement={"views": 0}),
+        ]
+        
+        collapsed = collapse_duplicates(results)
+        assert len(collapsed) == 2
+        assert sum(len(r.duplicates) for r in collapsed) == 1
+    
+    def test_simhash_matches_per_bit_weights(self):
+        """Test the packed bit counting gives the textbook SimHash"""
+        import hashlib
+        from main import simhash
+        
+        text = "Il nuovo framework open source per il machine learning distribuito promette tempi dimezzati"
+        normalized = text.casefold()
+        weights = [0] * 64
+        for i in range(len(normalized) - 3):
+            digest = int.from_bytes(hashlib.blake2b(normalized[i:i + 4].encode(), digest_size=8).digest(), "big")
+            for bit in range(64):
+                weights[bit] += 1 if digest >> bit & 1 else -1
+        
+        assert simhash(text) == sum(1 << bit for bit in range(64) if weights[bit] > 0)
+        assert simhash("troppo corto") is None
+    
+    def test_cached_pages_are_not_rehashed(self):
+        """Test fingerprints are computed when a source page is loaded and reused from the cache"""
+        import main
+        
+        request_data = {"query": "fingerprint cache test", "sources": ["google_news", "youtube"]}
+        with patch("main.simhash", wraps=main.simhash) as hashed:
+            client.post("/api/search", json=request_data)
+            assert hashed.call_count > 0
+            
+            hashed.reset_mock()
+            client.post("/api/search/stream", json=request_data)
+            assert hashed.call_count == 0
+
+class TestPagination:
+    """Test cursor pagination of search results"""
+    
+    def test_pages_served_from_merged_state(self):
+        """Test later pages come from the cached merged results without new provider calls"""
+        import main
+        
+        request_data = {"query": "paginated search", "sources": ["google_news", "youtube", "reddit"], "max_results": 2}
+        with patch("main.youtube_client.search", AsyncMock(wraps=main.youtube_client.search)) as youtube_search:
+            pages = [client.post("/api/search", json=request_data).json()]
+            while pages[-1]["next_cursor"]:
+                pages.append(client.post("/api/search", json={**request_data, "cursor": pages[-1]["next_cursor"]}).json())
+        
+        ids = [result["id"] for page in pages for result in page["results"]]
+        assert len(pages) > 1
+        assert len(ids) == len(set(ids))
+        assert all(page["total_results"] <= 2 for page in pages)
+        assert youtube_search.await_count == 1
+    
+    def test_next_provider_page_fetched(self):
+        """Test running out of merged results resumes each source from its page token"""
+        import main
+        from main import ResultPage
+        
+        def video(video_id):
+            item = main.youtube_client._get_mock_youtube_data("pagine")[0]
+            return {**item, "id": {"videoId": video_id}, "snippet": {**item["snippet"], "title": f"Video {video_id}"}}
+        
+        async def fake_search(query, max_results=20, page_token=None):
+            if page_token is None:
+                return ResultPage([video("v1"), video("v2")], next_page="token-2")
+            assert page_token == "token-2"
+            return ResultPage([video("v2"), video("v3")], next_page=None)
+        
+        request_data = {"query": "provider pages", "sources": ["youtube"], "max_results": 2}
+        with patch("main.youtube_client.search", side_effect=fake_search):
+            first = client.post("/api/search", json=request_data).json()
+            second = client.post("/api/search", json={**request_data, "cursor": first["next_cursor"]}).json()
+        
+        assert [r["id"] for r in first["results"]] and first["next_cursor"]
+        assert [r["id"] for r in second["results"]] == ["v3"]
+        assert second["next_cursor"] is None
+    
+    def test_invalid_cursor(self):
+        """Test malformed or foreign cursors are rejected"""
+        first = client.post("/api/search", json={"query": "cursor owner", "max_results": 1}).json()
+        
+        assert client.post("/api/search", json={"query": "cursor owner", "cursor": "not-a-cursor"}).status_code == 400
+        other = client.post("/api/search", json={"query": "another search", "cursor": first["next_cursor"]})
+        assert other.status_code == 400
+        
+        stream = client.post("/api/search/stream", json={"query": "cursor owner", "cursor": first["next_cursor"]})
+        assert stream.status_code == 400
+    
+    def test_each_search_has_its_own_page_state(self):
+        """Test running the same search again does not move the cursors of an earlier client"""
+        request_data = {"query": "page state owner", "sources": ["google_news", "youtube", "reddit"], "max_results": 1}
+        first = client.post("/api/search", json=request_data).json()
+        second_page = client.post("/api/search", json={**request_data, "cursor": first["next_cursor"]}).json()
+        
+        # Another client starts the same search and pages ahead
+        other = client.post("/api/search", json=request_data).json()
+        assert other["next_cursor"] != first["next_cursor"]
+        client.post("/api/search", json={**request_data, "cursor": other["next_cursor"]})
+        
+        again = client.post("/api/search", json={**request_data, "cursor": first["next_cursor"]}).json()
+        assert again["results"] == second_page["results"]
+        assert again["next_cursor"] == second_page["next_cursor"]
+
+class TestKeywordMatcher:
+    """Test the multi-keyword matcher used for SEO category detection"""
+    
+    def test_whole_word_case_insensitive_matches(self):
+        """Test hits respect word boundaries and report every position"""
+        from main import KeywordMatcher
+        
+        matcher = KeywordMatcher({"ai": ["AI", "machine learning"], "web": ["React", "React Native"], "devops": ["CI/CD"]})
+        text = "AI e Machine Learning: l'ai non è una email. React Native usa React; pipeline CI/CD."
+        hits = matcher.scan(text)
+        
+        assert hits["ai"]["count"] == 2
+        assert hits["ai"]["positions"] == [0, text.lower().index("l'ai") + 2]
+        assert hits["machine learning"]["keyword"] == "machine learning"
+        assert hits["react native"]["count"] == 1
+        assert hits["react"]["count"] == 2
+        assert hits["ci/cd"]["count"] == 1
+        assert matcher.label_counts(hits) == {"ai": 3, "web": 3, "devops": 1}
+    
+    def test_overlapping_keywords(self):
+        """Test keywords that are suffixes of other keywords are all reported"""
+        from main import KeywordMatcher
+        
+        matcher = KeywordMatcher({"data": ["big data", "data"], "cloud": ["google cloud", "cloud"]})
+        hits = matcher.scan("Big data su Google Cloud")
+        
+        assert {key: hit["count"] for key, hit in hits.items()} == {"big data": 1, "data": 1, "google cloud": 1, "cloud": 1}
+    
+    @pytest.mark.asyncio
+    async def test_category_detection_uses_taxonomy_keywords(self):
+        """Test detected categories come from built-in and taxonomy keywords"""
+        from main import SEOService
+        
+        service = SEOService()
+        with patch("main.config.MOCK_MODE", False):
+            suggestions = await service.generate_suggestions(
+                "Kubernetes e docker in produzione: la nostra pipeline CI/CD su AWS e serverless.",
+                ["kubernetes"]
+            )
+        
+        category_hits = suggestions.keyword_analysis["category_hits"]
+        assert category_hits["cloud"] == 2
+        assert category_hits["devops"] == 3
+        assert "ai" not in category_hits
+        
+        # Taxonomy-only categories are detected, ranked by hits, and drive titles and keywords
+        assert suggestions.title_suggestions[0].startswith("DevOps: ")
+        assert suggestions.keyword_analysis["primary_keywords"][:2] == ["devops", "docker"]
+        assert "AWS" in suggestions.keyword_analysis["primary_keywords"]
+    
+    @pytest.mark.asyncio
+    async def test_taxonomy_keywords_extend_built_in_categories(self):
+        """Test taxonomy categories mirroring a built-in one are merged into it"""
+        from main import SEOService
+        
+        service = SEOService()
+        await service.get_keyword_matcher()
+        
+        assert "ai-ml" not in service.category_keywords
+        assert "neural networks" in service.category_keywords["ai"]
+        assert [word.lower() for word in service.category_keywords["ai"]].count("machine learning") == 1
+        assert service.category_names["iot"] == "Internet of Things"
+
+class TestTermStats:
+    """Test measured keyword statistics"""
+    
+    def test_counts_density_and_positions(self):
+        """Test term, phrase and n-gram statistics of a text"""
+        from main import TermStats
+        
+        stats = TermStats.from_text("Il machine learning cambia tutto. Il machine learning e il cloud.")
+        
+        assert stats.token_count == 11
+        assert stats.phrase_stats("Machine Learning") == {
+            "count": 2, "density": round(4 / 11 * 100, 2), "first_position": 1, "first_position_ratio": round(1 / 11, 3)
+        }
+        assert stats.count("cloud") == 1
+        assert stats.count("intelligenza artificiale") == 0
+        assert stats.top(2, limit=1) == [{"term": "machine learning", "count": 2}]
+    
+    def test_paragraph_stats_merge(self):
+        """Test merging paragraph stats equals stats of the whole text"""
+        from main import TermStats
+        
+        paragraphs = ["Kubernetes in produzione con docker.", "Docker e kubernetes: guida pratica a docker."]
+        merged = TermStats()
+        for paragraph in paragraphs:
+            merged.merge(TermStats.from_paragraph(paragraph))
+        whole = TermStats.from_text("\n\n".join(paragraphs))
+        
+        assert merged.to_dict() == whole.to_dict()
+        assert whole.count("docker") == 3
+        assert whole.count("docker docker") == 0
+        assert whole.first_positions["guida"] == 8
+        assert TermStats.from_dict(whole.to_dict()).to_dict() == whole.to_dict()
+    
+    @pytest.mark.asyncio
+    async def test_keyword_analysis_is_measured(self):
+        """Test keyword analysis reports measured, reproducible values"""
+        from main import SEOService
+        
+        content = "Il cloud computing riduce i costi. Con il cloud computing e AWS si scala in fretta."
+        analysis = await SEOService()._analyze_keywords(content, ["cloud computing"], ["cloud"])
+        
+        assert analysis["keyword_density"]["cloud computing"]["count"] == 2
+        assert analysis["keyword_density"]["AWS"]["count"] == 1
+        assert "volume" not in analysis["keyword_density"]["AWS"]
+        assert analysis["long_tail_keywords"][0] == "cloud computing"
+        assert analysis["term_statistics"]["total_words"] == 16
+        assert analysis == await SEOService()._analyze_keywords(content, ["cloud computing"], ["cloud"])
+    
+    @pytest.mark.asyncio
+    async def test_long_tail_keywords_are_measured(self):
+        """Test target keywords longer than MAX_NGRAM words are counted in the content"""
+        from main import SEOService, TermStats
+        
+        content = "Ecco come funziona il cloud computing.\n\nCapire come funziona il cloud computing aiuta. Come funziona il cloud?"
+        analysis = await SEOService()._analyze_keywords(content, ["come funziona il cloud computing"], [])
+        
+        stats = TermStats.from_text(content)
+        assert analysis["keyword_density"]["come funziona il cloud computing"] == {
+            "count": 2,
+            "density": round(2 * 5 / stats.token_count * 100, 2),
+            "first_position": 1,
+            "first_position_ratio": round(1 / stats.token_count, 3)
+        }
+        # A phrase split by a paragraph break does not count
+        assert TermStats.scan_phrase("il cloud\n\ncomputing e il cloud computing", ["il", "cloud", "computing"]) == (1, 4)
+        assert stats.phrase_stats("come funziona il cloud computing")["count"] is None
+
+class TestCorpusIndex:
+    """Test the TF-IDF statistics index over stored results"""
+    
+    @pytest.mark.asyncio
+    async def test_incremental_build_and_lookup(self, tmp_path):
+        """Test new results are indexed incrementally and survive a reload from disk"""
+        import main
+        from main import CorpusIndex, TermStats, save_search_results
+        
+        index = CorpusIndex(str(tmp_path / "corpus.terms"))
+        await index.refresh()
+        baseline = index.document_count
+        baseline_df = index.document_frequency("zephyrite")
+        # The suite shares one database: unique ids keep reruns from upserting the same rows
+        suffix = uuid.uuid4().hex[:8]
+        
+        await save_search_results("corpus", [
+            make_result(id=f"corpus-1-{suffix}", title="Zephyrite per il cloud", description="Zephyrite e il cloud ibrido"),
+            make_result(id=f"corpus-2-{suffix}", title="Zephyrite in produzione", description="Guida al cloud"),
+            make_result(id=f"corpus-3-{suffix}", title="Kubernetes e cloud", description="Orchestrazione nel cloud"),
+        ])
+        
+        # A backlog larger than one batch is read with one database call per batch
+        with patch("main.config.CORPUS_INDEX_BATCH_SIZE", 2), \
+                patch("main.db.run", AsyncMock(wraps=main.db.run)) as db_run:
+            assert await index.refresh() == 3
+        assert db_run.await_count == 2
+        assert await index.refresh() == 0
+        assert index.document_count == baseline + 3
+        assert index.document_frequency("Zephyrite") == baseline_df + 2
+        assert index.document_frequency("nonexistentterm") == 0
+        
+        reloaded = CorpusIndex(index.path)
+        reloaded.load()
+        assert reloaded.document_frequency("zephyrite") == baseline_df + 2
+        assert reloaded.document_count == index.document_count
+        assert reloaded.idf("nonexistentterm") > reloaded.idf("cloud")
+        
+        stats = TermStats.from_text("Il cloud con Quarkonix")
+        terms = [item["term"] for item in reloaded.distinctive_terms(stats)]
+        assert terms[0] == "quarkonix"
+        assert "il" not in terms
+        
+        index.close()
+        reloaded.close()
+    
+    def test_empty_index(self):
+        """Test an index that was never built suggests nothing"""
+        from main import CorpusIndex, TermStats
+        
+        index = CorpusIndex(None)
+        assert index.document_frequency("cloud") == 0
+        assert index.distinctive_terms(TermStats.from_text("cloud computing")) == []
+
+class TestSEODraft:
+    """Test incremental SEO analysis of drafts"""
+    
+    def _post(self, document_id, paragraph_count, paragraphs, revision=None):
+        return client.post("/api/suggest-article/draft", json={
+            "document_id": document_id,
+            "paragraph_count": paragraph_count,
+            "paragraphs": [{"index": index, "text": text} for index, text in paragraphs.items()],
+            "target_keywords": ["kubernetes"],
+            "revision": revision
+        })
+    
+    def test_only_changed_paragraphs_are_analyzed(self):
+        """Test edits reuse cached paragraphs and match a full analysis of the draft"""
+        import main
+        
+        paragraphs = [
+            "Kubernetes in produzione: guida pratica per team DevOps.",
+            "Il cluster Kubernetes gira su AWS con docker e una pipeline CI/CD.",
+            "Conclusioni: il cloud riduce i costi operativi.",
+        ]
+        with patch("main.config.MOCK_MODE", False):
+            first = self._post("draft-1", 3, dict(enumerate(paragraphs))).json()
+            paragraphs[1] = "Il cluster Kubernetes gira su Azure con docker e serverless."
+            edited = self._post("draft-1", 3, {1: paragraphs[1]}, revision=first["revision"]).json()
+            full = client.post("/api/suggest-article", json={
+                "content": "\n\n".join(paragraphs), "target_keywords": ["kubernetes"]
+            }).json()
+        
+        assert (first["paragraphs_analyzed"], first["paragraphs_reused"]) == (3, 0)
+        assert (edited["paragraphs_analyzed"], edited["paragraphs_reused"]) == (1, 2)
+        assert edited["revision"] == first["revision"] + 1
+        assert edited["keyword_analysis"] == full["keyword_analysis"]
+        assert edited["seo_score"] == full["seo_score"]
+        assert "AWS" not in edited["keyword_analysis"]["keyword_hits"]
+    
+    def test_paragraph_count_truncates_draft(self):
+        """Test removing trailing paragraphs needs no paragraph text"""
+        with patch("main.config.MOCK_MODE", False):
+            first = self._post("draft-2", 2, {0: "Kubernetes e docker.", 1: "Kubernetes su AWS."}).json()
+            response = self._post("draft-2", 1, {}, revision=first["revision"])
+        
+        assert response.status_code == 200
+        assert response.json()["keyword_analysis"]["category_hits"].get("cloud") is None
+    
+    def test_unknown_draft_requires_full_text(self):
+        """Test partial edits of an unknown draft are rejected"""
+        assert self._post("draft-unknown", 3, {1: "Solo un paragrafo"}).status_code == 409
+        assert self._post("draft-3", 1, {2: "Fuori intervallo"}).status_code == 422
+    
+    def test_stale_revisions_rejected(self):
+        """Test overlapping edits are rejected instead of overwriting each other"""
+        first = self._post("draft-4", 2, {0: "Kubernetes e docker.", 1: "Kubernetes su AWS."}).json()
+        edited = self._post("draft-4", 2, {1: "Kubernetes su Azure."}, revision=first["revision"])
+        assert edited.status_code == 200
+        
+        assert self._post("draft-4", 2, {0: "Docker e basta."}, revision=first["revision"]).status_code == 409
+        assert self._post("draft-4", 2, {0: "Docker e basta."}).status_code == 409
+        # Resending the whole draft is always accepted
+        assert self._post("draft-4", 2, {0: "Docker e basta.", 1: "Kubernetes su Azure."}).status_code == 200
+    
+    def test_draft_state_read_from_shared_tier(self):
+        """Test a worker's stale local copy of a draft is ignored while Redis holds the state"""
+        import main
+        from main import RedisCache
+        
+        shared = {}
+        
+        async def redis_get(key):
+            return shared.get(key)
+        
+        async def redis_set(key, value, ttl):
+            shared[key] = value
+        
+        with patch("main.config.MOCK_MODE", False), \
+                patch.object(RedisCache, "available", property(lambda self: True)), \
+                patch.object(main.redis_cache, "get", side_effect=redis_get), \
+                patch.object(main.redis_cache, "set", side_effect=redis_set), \
+                patch.object(main.redis_cache, "acquire_lock", AsyncMock(return_value=True)), \
+                patch.object(main.redis_cache, "release_lock", AsyncMock()):
+            first = self._post("draft-5", 2, {0: "Kubernetes e docker.", 1: "Kubernetes su AWS."}).json()
+            state_key = main.cache_fingerprint("seo-draft", {"document_id": "draft-5"})
+            stale = shared[state_key]
+            
+            second = self._post("draft-5", 2, {1: "Kubernetes su Azure."}, revision=first["revision"]).json()
+            # This worker still holds the first version locally
+            main.memory_cache[state_key] = stale
+            third = self._post("draft-5", 2, {0: "Kubernetes e docker in produzione."}, revision=second["revision"]).json()
+        
+        hits = third["keyword_analysis"]["keyword_hits"]
+        assert "Azure" in hits and "AWS" not in hits
+
+class TestHTTPClientPool:
+    """Test shared HTTP client pool"""
+    
+    def test_clients_use_injected_http_client(self):
+        """Test provider clients use the injected pooled client"""
+        import httpx
+        from main import GoogleNewsClient, RedditClient
+        
+        shared = httpx.AsyncClient()
+        assert GoogleNewsClient("mock-key", http_client=shared).client is shared
+        assert RedditClient("mock-id", "mock-secret", http_client=shared).client is shared
+    
+    def test_lifespan_injects_shared_client(self):
+        """Test lifespan creates one pool for all providers and closes it on shutdown"""
+        import main
+        
+        with TestClient(app):
+            shared = main.google_news_client.http_client
+            assert shared is not None
+            assert main.youtube_client.http_client is shared
+            assert main.reddit_client.http_client is shared
+        
+        assert shared.is_closed
+        assert main.google_news_client.http_client is None
 
 # Performance tests
 class TestPerformance: